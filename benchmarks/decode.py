@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import struct
+import timeit
+
+from hyperpixel2r import Touch, FakeInterrupt
+from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+
+"""
+HyperPixel 2 Round: touch decode microbenchmark
+
+Compares the per-report cost of Touch against the original two-transaction,
+list-slicing decoder using a fake touch controller.
+
+"interrupt" times a complete read and decode, which includes the cost of the
+fake controller serving each transaction. "decode" times decoding alone.
+
+Run with: python3 decode.py
+"""
+
+
+# A finger dragging across the screen in slot 0 while slot 1 is released,
+# alternated so every report produces a callback.
+REPORTS = [
+    make_report((EVENT_CONTACT, 1, 100, 200)),
+    make_report((EVENT_CONTACT, 1, 101, 201)),
+]
+
+
+def legacy_handle_interrupt(touch, touches, pin):
+    """The original read and decode, kept here as the baseline."""
+    count = touch._bus.read_byte_data(touch._i2c_addr, 0x02)
+    count = 2
+    if count > 0:
+        data = touch._bus.read_i2c_block_data(touch._i2c_addr, 0x03, count * 6)
+        legacy_decode(touch, touches, data, count)
+
+
+def legacy_decode(touch, touches, data, count=2):
+    for i in range(count):
+        offset = i * 6
+        touch_status = False
+        touch_data = data[offset:offset + 6]
+        touch_event = touch_data[0] & 0xf0
+        touch_id = (touch_data[2] & 0xf0) >> 4
+        touch_data[0] &= 0x0f
+        touch_data[2] &= 0x0f
+        tx, ty, p1, p2 = struct.unpack(">HHBB", bytes(touch_data))
+
+        if touch_event & 128:
+            touch_status = True
+
+        if touch_event & 64:
+            touch_status = False
+
+        new_touch = touch_id, tx, ty, touch_status
+
+        current_touch = touches.get(touch_id, None)
+
+        if new_touch != current_touch:
+            touches[touch_id] = new_touch
+            if callable(touch._callback_handler):
+                touch._callback_handler(*touches[touch_id])
+
+
+def handler(touch_id, x, y, state):
+    pass
+
+
+def run(name, stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    per_report = best / number * 1e6
+    print("{0:<20} {1:8.2f} us/report".format(name, per_report))
+    return per_report
+
+
+if __name__ == "__main__":
+    number = 20000
+    touch = Touch(bus=FakeController(REPORTS, repeat=True), interrupt=FakeInterrupt())
+    touch.on_touch(handler)
+
+    legacy_touches = {}
+    legacy_data = [list(bytearray(report[1:])) for report in REPORTS]
+    reports = [bytearray(report) for report in REPORTS]
+
+    def legacy_decode_next():
+        legacy_data.reverse()
+        legacy_decode(touch, legacy_touches, legacy_data[0])
+
+    def decode_next():
+        reports.reverse()
+        touch._report[:] = reports[0]
+        touch._decode_report(0.0, 0.0)
+
+    legacy = run("legacy interrupt", lambda: legacy_handle_interrupt(touch, legacy_touches, None), number)
+    current = run("current interrupt", touch._handle_interrupt, number)
+    print("speedup {0:20.2f}x".format(legacy / current))
+
+    legacy = run("legacy decode", legacy_decode_next, number)
+    current = run("current decode", decode_next, number)
+    print("speedup {0:20.2f}x".format(legacy / current))
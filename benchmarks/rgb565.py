@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+import timeit
+from colorsys import hsv_to_rgb
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+from hyperpixel2r.display import CircleMask  # noqa: E402
+from hyperpixel2r.framebuffer import Framebuffer  # noqa: E402
+from hyperpixel2r.rgb565 import RGB565Converter  # noqa: E402
+
+
+"""
+HyperPixel 2 Round: RGB565 conversion benchmark
+
+Compares the per-frame cost of getting a 480x480 frame (a hue gradient, like
+the hue example) into a 16bpp framebuffer:
+
+* convert - the examples' original path, opening the framebuffer and writing
+  screen.convert(16, 0).get_buffer(), which allocates a new surface, every frame
+* pygame - Framebuffer.blit converting into a preallocated surface then copying
+  into the mapped framebuffer
+* numpy - Framebuffer.blit converting with an RGB565Converter straight into the
+  mapped framebuffer
+* numpy-dither - the same with ordered dithering
+* numpy-convert-only - RGB565Converter into its own array
+* pygame-masked, numpy-masked - pygame and numpy restricted to the visible circle
+* pygame-edge, pygame-edge-masked - the top 120 rows as a dirty rect, without and with the mask
+
+A temporary file stands in for the framebuffer.
+
+Run with: python3 rgb565.py
+"""
+
+
+def convert_and_write(screen, path):
+    with open(path, 'wb') as fb:
+        fb.write(screen.convert(16, 0).get_buffer())
+
+
+def run(name, stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    per_frame = best / number * 1e3
+    print("{0:<20} {1:8.2f} ms/frame".format(name, per_frame))
+    return per_frame
+
+
+if __name__ == "__main__":
+    number = 50
+    pygame.display.init()
+
+    screen = pygame.Surface((480, 480))
+    for y in range(480):
+        colour = tuple(int(c * 255) for c in hsv_to_rgb(y / 480.0, 1.0, 1.0))
+        pygame.draw.line(screen, colour, (0, y), (479, y))
+
+    fbdev = tempfile.NamedTemporaryFile()
+    fbdev.write(b'\x00' * (480 * 480 * 2))
+    fbdev.flush()
+
+    pygame_fb = Framebuffer(fbdev.name, width=480, height=480)
+    numpy_fb = Framebuffer(fbdev.name, width=480, height=480, converter=RGB565Converter())
+    dither_fb = Framebuffer(fbdev.name, width=480, height=480, converter=RGB565Converter(dither=True))
+    converter = RGB565Converter()
+    mask = CircleMask()
+    pygame_masked_fb = Framebuffer(fbdev.name, width=480, height=480, mask=mask)
+    numpy_masked_fb = Framebuffer(fbdev.name, width=480, height=480, converter=RGB565Converter(), mask=mask)
+
+    baseline = run("convert", lambda: convert_and_write(screen, fbdev.name), number)
+    for name, stmt in (
+        ("pygame", lambda: pygame_fb.blit(screen)),
+        ("numpy", lambda: numpy_fb.blit(screen)),
+        ("numpy-dither", lambda: dither_fb.blit(screen)),
+        ("numpy-convert-only", lambda: converter.convert(screen)),
+        ("pygame-masked", lambda: pygame_masked_fb.blit(screen)),
+        ("numpy-masked", lambda: numpy_masked_fb.blit(screen)),
+        ("pygame-edge", lambda: pygame_fb.blit(screen, [(0, 0, 480, 120)])),
+        ("pygame-edge-masked", lambda: pygame_masked_fb.blit(screen, [(0, 0, 480, 120)])),
+    ):
+        print("speedup {0:20.2f}x".format(baseline / run(name, stmt, number)))
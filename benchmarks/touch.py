@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import math
+import platform
+import sys
+import threading
+import time
+import timeit
+
+import hyperpixel2r
+from hyperpixel2r import Touch, TouchEvent, FakeInterrupt, QUEUE_COALESCE, monotonic
+from hyperpixel2r.filters import DeadZone, EMA, OneEuro
+from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT, EVENT_LIFT_UP
+
+
+"""
+HyperPixel 2 Round: touch benchmark suite
+
+Drives Touch with a fake touch controller and reports, as JSON:
+
+* decode - cost of decoding a single report, without the i2c read
+* decode-gesture-only - the same with gesture_only=True, where touches aren't decoded
+* dispatch - overhead of dispatching an event to a handler versus calling it directly
+* modes - reports/second, events/second and interrupt-to-handler latency
+  (p50/p99) for synchronous, queued, dispatch thread and coalesced delivery.
+  Queued modes are polled every 8 reports.
+* filters - events produced by a resting, jittering finger and decode cost
+  for each touch filter
+
+Run with: python3 touch.py --output results.json
+"""
+
+
+def drag_reports(count):
+    """A finger dragging in circles, lifted and pressed again every 100 reports."""
+    reports = []
+    for i in range(count):
+        angle = i * 2 * math.pi / 97
+        x = int(240 + 200 * math.cos(angle))
+        y = int(240 + 200 * math.sin(angle))
+        event = EVENT_LIFT_UP if i % 100 == 99 else EVENT_CONTACT
+        reports.append(make_report((event, 0, x, y)))
+    return reports
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))]
+
+
+def summarise(latencies):
+    return {
+        'p50_us': percentile(latencies, 50) * 1e6 if latencies else None,
+        'p99_us': percentile(latencies, 99) * 1e6 if latencies else None,
+        'max_us': max(latencies) * 1e6 if latencies else None
+    }
+
+
+def bench_decode(reports, number, **kwargs):
+    touch = Touch(bus=FakeController(), interrupt=FakeInterrupt(), **kwargs)
+    # With hardware gestures the report is preceded by the gesture ID
+    prefix = bytearray(len(touch._report) - len(reports[0]))
+    buffers = [prefix + bytearray(report) for report in reports[:2]]
+
+    def decode_next():
+        buffers.reverse()
+        touch._report[:] = buffers[0]
+        touch._decode_report(0.0, 0.0)
+
+    def copy_only():
+        buffers.reverse()
+        touch._report[:] = buffers[0]
+
+    decode = min(timeit.repeat(decode_next, number=number, repeat=5))
+    copy = min(timeit.repeat(copy_only, number=number, repeat=5))
+    return {'us_per_report': (decode - copy) / number * 1e6}
+
+
+def bench_dispatch(number):
+    touch = Touch(bus=FakeController(), interrupt=FakeInterrupt())
+    event = TouchEvent(0, 240, 240, True, 0.0, 0.0)
+
+    def handler(touch_id, x, y, state):
+        pass
+
+    touch.on_touch(handler)
+    direct = min(timeit.repeat(lambda: handler(event.touch_id, event.x, event.y, event.state), number=number, repeat=5))
+    dispatch = min(timeit.repeat(lambda: touch._dispatch(event), number=number, repeat=5))
+    return {
+        'direct_us': direct / number * 1e6,
+        'dispatch_us': dispatch / number * 1e6,
+        'overhead_us': (dispatch - direct) / number * 1e6
+    }
+
+
+def jitter_reports(count):
+    """A finger resting at the center with a few pixels of jitter, as the controller reports it."""
+    reports = []
+    for i in range(count):
+        reports.append(make_report((EVENT_CONTACT, 0, 240 + (i * 7) % 5 - 2, 240 + (i * 3) % 5 - 2)))
+    return reports
+
+
+def bench_filters(count, number):
+    reports = jitter_reports(count)
+    results = []
+    for name, touch_filter in (('none', None), ('dead-zone', DeadZone()), ('ema', EMA()), ('one-euro', OneEuro())):
+        interrupt = FakeInterrupt()
+        touch = Touch(bus=FakeController(reports), interrupt=interrupt, filter=touch_filter)
+        events = []
+        touch.on_touch_event(events.append)
+        for i in range(count):
+            interrupt.trigger(i * 0.01)
+        event_count = len(events)
+
+        buffers = [bytearray(report) for report in reports[:5]]
+        timestamps = [0.0]
+
+        def decode_next():
+            buffers.append(buffers.pop(0))
+            timestamps[0] += 0.01
+            touch._report[:] = buffers[0]
+            touch._decode_report(timestamps[0], timestamps[0])
+
+        decode = min(timeit.repeat(decode_next, number=number, repeat=5))
+        results.append({
+            'filter': name,
+            'reports': count,
+            'events': event_count,
+            'us_per_report': decode / number * 1e6
+        })
+    return results
+
+
+def count_events(reports):
+    """Count the events synchronous delivery produces for these reports."""
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=FakeController(reports), interrupt=interrupt)
+    events = []
+    touch.on_touch_event(events.append)
+    for _ in reports:
+        interrupt.trigger()
+    return len(events)
+
+
+def bench_mode(name, reports, expected, poll_every=8, **kwargs):
+    controller = FakeController(reports)
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=controller, interrupt=interrupt, **kwargs)
+    latencies = []
+    done = threading.Event()
+
+    @touch.on_touch_event
+    def handle(event):
+        latencies.append(monotonic() - event.timestamp)
+        if len(latencies) == expected:
+            done.set()
+
+    queued = touch._queue is not None
+    dispatching = touch._dispatcher is not None
+
+    # Queued modes are drained every few reports, like a render loop polling once per frame
+    t_start = time.time()
+    for i in range(len(reports)):
+        interrupt.trigger()
+        if queued and not dispatching and i % poll_every == poll_every - 1:
+            touch.poll()
+    if queued and not dispatching:
+        touch.poll()
+    t_reads = time.time() - t_start
+
+    if dispatching:
+        done.wait(10.0)
+    t_total = time.time() - t_start
+    touch.close()
+
+    return {
+        'mode': name,
+        'reports': len(reports),
+        'events': len(latencies),
+        'dropped': touch.dropped,
+        'reports_per_second': len(reports) / t_reads,
+        'events_per_second': len(latencies) / t_total,
+        'latency': summarise(latencies)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HyperPixel 2 Round: touch benchmark suite")
+    parser.add_argument("--reports", type=int, default=20000, help="touch reports to replay per mode")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    reports = drag_reports(args.reports)
+    expected = count_events(reports)
+
+    results = {
+        'version': hyperpixel2r.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'decode': bench_decode(reports, args.reports),
+        'decode-gesture-only': bench_decode(reports, args.reports, gesture_only=True),
+        'dispatch': bench_dispatch(args.reports),
+        'modes': [
+            bench_mode('sync', reports, expected),
+            bench_mode('queued', reports, expected, queue_size=64),
+            bench_mode('queued-coalesce', reports, expected, queue_size=64, queue_policy=QUEUE_COALESCE),
+            bench_mode('dispatch-thread', reports, expected, queue_size=args.reports * 2, dispatch=True),
+            bench_mode('coalesced', reports, expected, coalesce=1.0 / 30),
+        ],
+        'filters': bench_filters(1000, args.reports)
+    }
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
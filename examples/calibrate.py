@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import sys
+import json
+import time
+import pygame
+from hyperpixel2r import Display, Touch
+from hyperpixel2r.transform import calibrate
+
+
+"""
+HyperPixel 2 Touch Calibration
+
+Touch the centre of each target in turn. The calibration matrix is printed
+and saved as JSON, ready to pass to Touch(calibration=...).
+
+Run with: sudo SDL_FBDEV=/dev/fb0 python3 calibrate.py [calibration.json]
+"""
+
+
+class Hyperpixel2r:
+    screen = None
+
+    def __init__(self):
+        self.display = Display()
+        self.screen = self.display.screen
+
+        self.screen.fill((0, 0, 0))
+        self.display.update()
+        print(self.display.report())
+
+        self._targets = [
+            (240, 60),   # Top
+            (420, 247),  # Right
+            (240, 434),  # Bottom
+            (60, 247),   # Left
+            (240, 247),  # Middle
+        ]
+        self._touch = None
+        self._last = None
+        # The touch ID that pressed the current target, and every touch ID that's down
+        self._pressed = None
+        self._down = set()
+
+    def touch(self, touch_id, x, y, state):
+        if state:
+            self._down.add(touch_id)
+        else:
+            self._down.discard(touch_id)
+
+        # Follow only the finger that pressed the target, the unused slot reports
+        # releases of its own and a second finger shouldn't move the sample
+        if self._pressed is None and state and self._touch is None:
+            self._pressed = touch_id
+        if touch_id != self._pressed:
+            return
+
+        # Take the position a finger is lifted from, it has had time to settle
+        if state:
+            self._last = (x, y)
+        else:
+            self._touch = self._last
+            self._pressed = None
+
+    def calibrate(self, timeout=10):
+        points = []
+        for tx, ty in self._targets:
+            # Don't show the next target until the last one has been let go of
+            t_start = time.time()
+            while self._down:
+                if time.time() - t_start > timeout:
+                    raise RuntimeError("Calibration timed out waiting for the screen to be released!")
+                time.sleep(0.01)
+
+            self._pressed = None
+            self._last = None
+            self._touch = None
+
+            self.screen.fill((0, 0, 0))
+            pygame.draw.circle(self.screen, (255, 255, 255), (tx, ty), 20, 2)
+            pygame.draw.line(self.screen, (255, 255, 255), (tx - 30, ty), (tx + 30, ty))
+            pygame.draw.line(self.screen, (255, 255, 255), (tx, ty - 30), (tx, ty + 30))
+            self.display.update()
+
+            t_start = time.time()
+            while self._touch is None:
+                if time.time() - t_start > timeout:
+                    raise RuntimeError("Calibration timed out!")
+                time.sleep(0.01)
+
+            print("Target {0}, {1} touched at {2}, {3}".format(tx, ty, *self._touch))
+            points.append((self._touch, (tx, ty)))
+
+        self.screen.fill((0, 0, 0))
+        self.display.update()
+        return calibrate(points)
+
+
+path = sys.argv[1] if len(sys.argv) > 1 else "calibration.json"
+
+display = Hyperpixel2r()
+touch = Touch()
+
+
+@touch.on_touch
+def handle_touch(touch_id, x, y, state):
+    display.touch(touch_id, x, y, state)
+
+
+matrix = display.calibrate()
+touch.close()
+
+print("Calibration: {0}".format(matrix))
+with open(path, "w") as f:
+    json.dump({"calibration": matrix}, f)
+print("Saved to {0}, use with: Touch(calibration=json.load(open({0!r}))['calibration'])".format(path))
@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-import os
 import sys
 import signal
 import pygame
@@ -8,7 +7,7 @@ import math
 import time
 import datetime
 from colorsys import hsv_to_rgb
-from hyperpixel2r import Touch
+from hyperpixel2r import Display, Touch
 
 
 """
@@ -21,13 +20,12 @@ Run with: sudo SDL_FBDEV=/dev/fb0 python3 clock.py
 class Hyperpixel2r:
     screen = None
     def __init__(self):
-        self._init_display()
+        self.display = Display()
+        self.screen = self.display.screen
 
         self.screen.fill((0, 0, 0))
-        if self._rawfb:
-            self._updatefb()
-        else:
-            pygame.display.update()
+        self.display.update()
+        print(self.display.report())
 
         # For some reason the canvas needs a 7px vertical offset
         # circular screens are weird...
@@ -38,62 +36,22 @@ class Hyperpixel2r:
         self._marks = 220
 
         self._running = False
-        self._origin = pygame.math.Vector2(*self.center)
         self._clock = pygame.time.Clock()
         self._colour = (255, 0, 255)
 
+        # The face only changes once a second, or when the colour is changed,
+        # and only the middle of it unless it's the colour
+        self._dirty = self.display.dirty_rects()
+        self._drawn = None
+        self._drawn_colour = None
+
     def _exit(self, sig, frame):
         self._running = False
         print("\nExiting!...\n")
 
-    def _init_display(self):
-        self._rawfb = False
-        # Based on "Python GUI in Linux frame buffer"
-        # http://www.karoltomala.com/blog/?p=679
-        DISPLAY = os.getenv("DISPLAY")
-        if DISPLAY:
-            print("Display: {0}".format(DISPLAY))
-
-        if os.getenv('SDL_VIDEODRIVER'):
-            print("Using driver specified by SDL_VIDEODRIVER: {}".format(os.getenv('SDL_VIDEODRIVER')))
-            pygame.display.init()
-            size = (pygame.display.Info().current_w, pygame.display.Info().current_h)
-            if size == (480, 480): # Fix for 480x480 mode offset
-                size = (640, 480)
-            self.screen = pygame.display.set_mode(size, pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.NOFRAME | pygame.HWSURFACE)
-            return
-
-        else:
-            # Iterate through drivers and attempt to init/set_mode
-            for driver in ['rpi', 'kmsdrm', 'fbcon', 'directfb', 'svgalib']:
-                os.putenv('SDL_VIDEODRIVER', driver)
-                try:
-                    pygame.display.init()
-                    size = (pygame.display.Info().current_w, pygame.display.Info().current_h)
-                    if size == (480, 480):  # Fix for 480x480 mode offset
-                        size = (640, 480)
-                    self.screen = pygame.display.set_mode(size, pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.NOFRAME | pygame.HWSURFACE)
-                    print("Using driver: {0}, Framebuffer size: {1:d} x {2:d}".format(driver, *size))
-                    return
-                except pygame.error as e:
-                    print('Driver "{0}" failed: {1}'.format(driver, e))
-                    continue
-                break
-
-        print("All SDL drivers failed, falling back to raw framebuffer access.")
-        self._rawfb = True
-        os.putenv('SDL_VIDEODRIVER', 'dummy')
-        pygame.display.init()  # Need to init for .convert() to work
-        self.screen = pygame.Surface((480, 480))
-
-    def __del__(self):
-        "Destructor to make sure pygame shuts down, etc."
-
-    def touch(self, x, y, state):
-        touch = pygame.math.Vector2(x, y)
-        distance = self._origin.distance_to(touch)
-        angle = pygame.math.Vector2().angle_to(self._origin - touch)
-        angle %= 360
+    def touch(self, angle, distance, state):
+        # Polar touch angles start at 12 o'clock, the colour wheel starts at 9
+        angle = (angle + 90) % 360
 
         value = (distance / 240.0)
         value = min(1.0, value)
@@ -150,11 +108,6 @@ class Hyperpixel2r:
         gfxdraw.aapolygon(self.screen, (tl, tr, br, bl), colour)
         gfxdraw.filled_polygon(self.screen, (tl, tr, br, bl), colour)
 
-    def _updatefb(self):
-        fbdev = os.getenv('SDL_FBDEV', '/dev/fb0')
-        with open(fbdev, 'wb') as fb:
-            fb.write(self.screen.convert(16, 0).get_buffer())
-
     def run(self):
         self._running = True
         signal.signal(signal.SIGINT, self._exit)
@@ -171,6 +124,11 @@ class Hyperpixel2r:
             # self._colour = tuple([int(c * 255) for c in hsv_to_rgb(time.time() / 12.0, 1.0, 1.0)])
             now = datetime.datetime.now()
 
+            if self._drawn == (now.hour, now.minute, now.second, self._colour):
+                self._clock.tick(30)
+                continue
+            self._drawn = (now.hour, now.minute, now.second, self._colour)
+
             a_s = now.second / 60.0 * 360.0
 
             a_m = now.minute / 60.0 * 360.0
@@ -196,16 +154,23 @@ class Hyperpixel2r:
             point_hour_start = self._get_point(self.center, a_h, 10)
             point_hour_end = self._get_point(self.center, a_h, self._marks - 90)
 
-            # Clear the center of the clock
-            # Black circle on a black background so we don't care about aa
-            self._circle((0, 0, 0), self.center, self._radius, antialias=False)
+            if self._colour != self._drawn_colour:
+                self._drawn_colour = self._colour
+                self._dirty.add_all()
+
+                # Clear the center of the clock
+                # Black circle on a black background so we don't care about aa
+                self._circle((0, 0, 0), self.center, self._radius, antialias=False)
 
-            for s in range(60):
-                a = 360 / 60.0 * s
-                end = self._get_point(self.center, a, self._marks + 5)
-                self._line(self._colour, self.center, end, 3)
+                for s in range(60):
+                    a = 360 / 60.0 * s
+                    end = self._get_point(self.center, a, self._marks + 5)
+                    self._line(self._colour, self.center, end, 3)
 
-            self._circle((0, 0, 0), self.center, self._marks - 5)
+            # Everything from here on is inside the minute marks
+            inner = self._marks - 5
+            self._circle((0, 0, 0), self.center, inner)
+            self._dirty.add((self.center[0] - inner - 1, self.center[1] - inner - 1, inner * 2 + 3, inner * 2 + 3))
 
             for s in range(12):
                 a = 360 / 12.0 * s
@@ -229,23 +194,22 @@ class Hyperpixel2r:
             self._circle((0, 0, 0), self.center, 20)
             self._circle(self._colour, self.center, 10)
 
-            if self._rawfb:
-                self._updatefb()
-            else:
-                pygame.display.flip()
+            rects = self._dirty.pop()
+            self.display.update(rects)
             self._clock.tick(30)  # Aim for 30fps
 
-        pygame.quit()
+        self.display.close()
         sys.exit(0)
 
 
 display = Hyperpixel2r()
-touch = Touch()
+# Deliver each touch's angle and distance from the center with every event
+touch = Touch(polar=True)
 
 
-@touch.on_touch
-def handle_touch(touch_id, x, y, state):
-    display.touch(x, y, state)
+@touch.on_touch_event
+def handle_touch(event):
+    display.touch(event.angle, event.radius, event.state)
 
 
 display.run()
@@ -1,12 +1,11 @@
 #!/usr/bin/env python3
-import os
 import sys
 import signal
 import pygame
 import time
 import colorsys
 import math
-from hyperpixel2r import Touch
+from hyperpixel2r import Display, Touch
 
 
 print("""HyperPixel 2 Lots of Circles Demo
@@ -64,13 +63,12 @@ class Hyperpixel2r:
     screen = None
 
     def __init__(self):
-        self._init_display()
+        self.display = Display()
+        self.screen = self.display.screen
 
         self.screen.fill((0, 0, 0))
-        if self._rawfb:
-            self._updatefb()
-        else:
-            pygame.display.update()
+        self.display.update()
+        print(self.display.report())
 
         self._running = False
 
@@ -78,54 +76,6 @@ class Hyperpixel2r:
         self._running = False
         print("\nExiting!...\n")
 
-    def _init_display(self):
-        self._rawfb = False
-        # Based on "Python GUI in Linux frame buffer"
-        # http://www.karoltomala.com/blog/?p=679
-        DISPLAY = os.getenv("DISPLAY")
-        if DISPLAY:
-            print("Display: {0}".format(DISPLAY))
-
-        if os.getenv('SDL_VIDEODRIVER'):
-            print("Using driver specified by SDL_VIDEODRIVER: {}".format(os.getenv('SDL_VIDEODRIVER')))
-            pygame.display.init()
-            size = (pygame.display.Info().current_w, pygame.display.Info().current_h)
-            if size == (480, 480): # Fix for 480x480 mode offset
-                size = (640, 480)
-            self.screen = pygame.display.set_mode(size, pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.NOFRAME | pygame.HWSURFACE)
-            return
-
-        else:
-            # Iterate through drivers and attempt to init/set_mode
-            for driver in ['rpi', 'kmsdrm', 'fbcon', 'directfb', 'svgalib']:
-                os.putenv('SDL_VIDEODRIVER', driver)
-                try:
-                    pygame.display.init()
-                    size = (pygame.display.Info().current_w, pygame.display.Info().current_h)
-                    if size == (480, 480):  # Fix for 480x480 mode offset
-                        size = (640, 480)
-                    self.screen = pygame.display.set_mode(size, pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.NOFRAME | pygame.HWSURFACE)
-                    print("Using driver: {0}, Framebuffer size: {1:d} x {2:d}".format(driver, *size))
-                    return
-                except pygame.error as e:
-                    print('Driver "{0}" failed: {1}'.format(driver, e))
-                    continue
-                break
-
-        print("All SDL drivers failed, falling back to raw framebuffer access.")
-        self._rawfb = True
-        os.putenv('SDL_VIDEODRIVER', 'dummy')
-        pygame.display.init()  # Need to init for .convert() to work
-        self.screen = pygame.Surface((480, 480))
-
-    def __del__(self):
-        "Destructor to make sure pygame shuts down, etc."
-
-    def _updatefb(self):
-        fbdev = os.getenv('SDL_FBDEV', '/dev/fb0')
-        with open(fbdev, 'wb') as fb:
-            fb.write(self.screen.convert(16, 0).get_buffer())
-
     def run(self):
         self._running = True
         signal.signal(signal.SIGINT, self._exit)
@@ -148,11 +98,8 @@ class Hyperpixel2r:
                     b = min(255, int(b))
                     pygame.draw.circle(self.screen, (r, g, b), ((x * 15) + 6, (y * 15) + 6 + 7), 7)
 
-            if self._rawfb:
-                self._updatefb()
-            else:
-                pygame.display.flip()
-        pygame.quit()
+            self.display.update()
+        self.display.close()
         sys.exit(0)
 
     def touch(self, x, y, state):
@@ -26,16 +26,22 @@ except ImportError:
 
 os.system("sudo modprobe uinput")
 
-rotate = False
+# display_rotate=0-3 rotates the display in 90 degree steps clockwise,
+# 0x10000 and 0x20000 flip it horizontally and vertically
+rotation = 0
+flip_x = False
+flip_y = False
 
 try:
     config = open("/boot/config.txt").read().split("\n")
     for option in config:
         if option.startswith("display_rotate="):
             key, value = option.split("=")
-            if value.strip() == "0":
-               rotate = True
-except IOError:
+            value = int(value.split("#")[0].strip(), 0)
+            rotation = (value & 0x3) * 90
+            flip_x = bool(value & 0x10000)
+            flip_y = bool(value & 0x20000)
+except (IOError, ValueError):
     pass
 
 DAEMON = False
@@ -152,7 +158,7 @@ def write_status(touch_id, x, y, touch_state):
 
 log("HyperPixel2r Touch daemon running...")
 
-touch = Touch()
+touch = Touch(rotation=rotation, flip_x=flip_x, flip_y=flip_y)
 
 
 @touch.on_touch
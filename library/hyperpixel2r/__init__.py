@@ -1,53 +1,701 @@
+import ctypes
 import smbus2
 import struct
-import RPi.GPIO as GPIO
+import threading
+from collections import deque
+
+from .interrupt import monotonic, Interrupt, GPIOInterrupt, GPIODInterrupt, PollingInterrupt, FakeInterrupt  # noqa: F401
+from .stats import TouchStats
+from .transform import Transform
 
 
 __version__ = '0.0.1'
 
+REG_GESTURE_ID = 0x01
+REG_TOUCH_COUNT = 0x02
+REG_TOUCH_DATA = 0x03
+
+# CST816 configuration registers
+REG_MOTION_MASK = 0xEC
+REG_IRQ_PULSE_WIDTH = 0xED
+REG_NOR_SCAN_PER = 0xEE
+REG_AUTO_SLEEP_TIME = 0xF9
+REG_IRQ_CTL = 0xFA
+REG_LONG_PRESS_TIME = 0xFC
+REG_DIS_AUTO_SLEEP = 0xFE
+
+# REG_MOTION_MASK bits, enable continuous left/right and up/down swipes and double click gestures
+MOTION_CON_LR = 0x04
+MOTION_CON_UD = 0x02
+MOTION_D_CLICK = 0x01
+
+# REG_IRQ_CTL bits, choose which activity pulses the interrupt line
+IRQ_EN_TEST = 0x80
+IRQ_EN_TOUCH = 0x40
+IRQ_EN_CHANGE = 0x20
+IRQ_EN_MOTION = 0x10
+# Only interrupt once for a long press, rather than repeatedly while it's held
+IRQ_ONCE_WLP = 0x01
+
+# Hardware gesture IDs reported in REG_GESTURE_ID
+HW_GESTURE_NONE = 0x00
+HW_GESTURE_SWIPE_UP = 0x01
+HW_GESTURE_SWIPE_DOWN = 0x02
+HW_GESTURE_SWIPE_LEFT = 0x03
+HW_GESTURE_SWIPE_RIGHT = 0x04
+HW_GESTURE_CLICK = 0x05
+HW_GESTURE_DOUBLE_CLICK = 0x0B
+HW_GESTURE_LONG_PRESS = 0x0C
+
+# Names for configure() and config(), in the order they're written
+CONFIG_REGISTERS = (
+    ('motion_mask', REG_MOTION_MASK),
+    ('irq_pulse_width', REG_IRQ_PULSE_WIDTH),
+    ('report_period', REG_NOR_SCAN_PER),
+    ('auto_sleep_time', REG_AUTO_SLEEP_TIME),
+    ('irq_ctl', REG_IRQ_CTL),
+    ('long_press_time', REG_LONG_PRESS_TIME),
+    ('disable_auto_sleep', REG_DIS_AUTO_SLEEP),
+)
+
+# The visible circle is offset 7px vertically from the middle of the 480x480 area,
+# circular screens are weird...
+CENTER = (240, 247)
+RADIUS = 240
+
+TOUCH_RECORD_SIZE = 6
+MAX_TOUCHES = 2
+REPORT_SIZE = 1 + MAX_TOUCHES * TOUCH_RECORD_SIZE
+
+# xh, yh, p1, p2 - event flag and touch ID are packed into the top nibbles of xh and yh
+_TOUCH_RECORD = struct.Struct(">HHBB")
+_TOUCH_RECORD_SLOTS = tuple((slot, 1 + slot * TOUCH_RECORD_SIZE) for slot in range(MAX_TOUCHES))
+
+QUEUE_DROP_OLDEST = 'drop-oldest'
+QUEUE_COALESCE = 'coalesce'
+
+
+class TouchEvent(object):
+    """A single touch event.
+
+    Behaves like a (touch_id, x, y, state, timestamp, read_timestamp, p1, p2)
+    tuple for unpacking and indexing, but with a fixed, compact layout.
+
+    * timestamp - monotonic time of the interrupt edge
+    * read_timestamp - monotonic time the i2c read completed
+    * p1, p2 - raw pressure (weight) and area bytes reported by the controller
+
+    With polar mapping enabled events also have angle (degrees clockwise from
+    12 o'clock) and radius (pixels) around the display center, otherwise None.
+
+    Events from a hyperpixel2r.manager.TouchManager have the device id they
+    came from in device, otherwise None.
+
+    """
+
+    __slots__ = ('touch_id', 'x', 'y', 'state', 'timestamp', 'read_timestamp', 'p1', 'p2', 'angle', 'radius', 'device')
+    _fields = ('touch_id', 'x', 'y', 'state', 'timestamp', 'read_timestamp', 'p1', 'p2')
+
+    def __init__(self, touch_id, x, y, state, timestamp=None, read_timestamp=None, p1=0, p2=0):
+        self.touch_id = touch_id
+        self.x = x
+        self.y = y
+        self.state = state
+        self.timestamp = timestamp
+        self.read_timestamp = read_timestamp
+        self.p1 = p1
+        self.p2 = p2
+        self.angle = None
+        self.radius = None
+        self.device = None
+
+    def _astuple(self):
+        return (self.touch_id, self.x, self.y, self.state, self.timestamp, self.read_timestamp, self.p1, self.p2)
+
+    def __iter__(self):
+        return iter(self._astuple())
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return self._astuple()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, TouchEvent):
+            other = other._astuple()
+        return self._astuple() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._astuple())
+
+    def __repr__(self):
+        return "TouchEvent({})".format(", ".join("{}={!r}".format(field, getattr(self, field)) for field in self._fields))
+
 
 class Touch:
-    def __init__(self, bus=11, i2c_addr=0x15, interrupt_pin=27):
+    def __init__(self, bus=11, i2c_addr=0x15, interrupt_pin=27, fast_read=True, queue_size=0, queue_policy=QUEUE_DROP_OLDEST, dispatch=False, coalesce=0, polling=False, polling_interval=0.01, polling_idle_interval=0.1, interrupt=None, stats=False, polar=False, rotation=0, flip_x=False, flip_y=False, calibration=None, filter=None, recover=True, retries=2, backoff=0.01, max_backoff=1.0, auto_sleep=None, report_period=None, hardware_gestures=False, gesture_only=False):
+        """Set up the touch driver.
+
+        :param bus: i2c bus number of the touch controller, or an existing SMBus instance
+        :param i2c_addr: i2c address of the touch controller
+        :param interrupt_pin: BCM pin connected to the touch interrupt line
+        :param fast_read: read the touch count and both touch records in a single block transaction
+        :param queue_size: if non-zero, queue up to this many events instead of calling the handler from the interrupt
+        :param queue_policy: QUEUE_DROP_OLDEST to discard the oldest event when the queue is full,
+            or QUEUE_COALESCE to also merge consecutive events for the same touch into the latest one
+        :param dispatch: start a thread that drains the queue into the handler, otherwise call poll() or events()
+        :param coalesce: if non-zero, merge moves of the same touch occurring within this many seconds into the latest one,
+            presses and releases are always delivered immediately
+        :param polling: read the controller from a timer thread instead of using the interrupt pin
+        :param polling_interval: seconds between reads while a finger is down
+        :param polling_idle_interval: seconds between reads while nothing is touched
+        :param interrupt: an Interrupt source, overrides interrupt_pin and polling
+        :param stats: collect counters and timing histograms, see stats()
+        :param polar: add angle and radius around the display center to TouchEvents,
+            True to use the default center or a hyperpixel2r.polar.PolarMap
+        :param rotation: display rotation in degrees clockwise (0, 90, 180 or 270), touches are rotated to match
+        :param flip_x: mirror touches horizontally
+        :param flip_y: mirror touches vertically
+        :param calibration: 2x3 affine calibration matrix, see hyperpixel2r.transform.calibrate()
+        :param filter: a hyperpixel2r.filters.Filter to smooth or stabilise touch positions
+        :param recover: recover from i2c errors instead of raising them from the interrupt,
+            failed reads are retried, then the bus is reopened and the controller reinitialised
+            from a background thread until it responds
+        :param retries: immediate read retries before starting recovery
+        :param backoff: initial seconds between recovery attempts, doubling after each failure
+        :param max_backoff: maximum seconds between recovery attempts
+        :param auto_sleep: False to stop the controller dropping into its low power mode, None to leave it alone
+        :param report_period: controller report period in units of 10ms, None to leave it alone
+        :param hardware_gestures: also read the controller's own gesture register, in the same
+            transaction as the touch report, and pass swipes, clicks and long presses to on_gesture()
+        :param gesture_only: configure the controller to interrupt only on gestures and skip decoding
+            touches entirely, for simple UIs that need nothing else
+
+        auto_sleep, report_period, gesture_only and any configure() settings are written at
+        start up and again after every recovery.
+
+        """
+        if queue_policy not in (QUEUE_DROP_OLDEST, QUEUE_COALESCE):
+            raise ValueError("Invalid queue_policy: {}".format(queue_policy))
+
+        if dispatch and not queue_size:
+            raise ValueError("dispatch requires a non-zero queue_size")
+
         self._i2c_addr = i2c_addr
         self._interrupt_pin = interrupt_pin
-        self._bus = smbus2.SMBus(bus)
+        self._fast_read = fast_read
+        # Only a bus we opened ourselves can be reopened during recovery
+        self._bus_number = bus if isinstance(bus, int) else None
+        self._bus = smbus2.SMBus(bus) if isinstance(bus, int) else bus
         self._callback_handler = None
-        self._touches = {}
+        self._event_handler = None
+        self._stats_handler = None
+        self._stats = TouchStats() if stats else None
+
+        if polar is True:
+            from .polar import PolarMap
+            polar = PolarMap()
+        self._polar = polar or None
+
+        transform = Transform(rotation, flip_x, flip_y, calibration)
+        self._transform = None if transform.identity else transform.coefficients
+        self._filter = filter.apply if filter is not None else None
+
+        self._hardware_gestures = hardware_gestures or gesture_only
+        self._gesture_only = gesture_only
+        self._gesture_handler = None
+        self._last_gesture = HW_GESTURE_NONE
+        if self._hardware_gestures:
+            self._gestures = self._hardware_gesture_map(transform)
+        # The last event emitted for each of the controller's touch slots
+        self._slots = [None] * MAX_TOUCHES
+
+        # In queued mode the interrupt only reads, decodes and appends to a bounded deque.
+        # There's a single producer (the interrupt) so appends and the coalescing
+        # overwrite of queue[-1] are safe against a consumer popping from the left.
+        self._queue = deque(maxlen=queue_size) if queue_size else None
+        self._queue_coalesce = queue_policy == QUEUE_COALESCE
+        self._queue_ready = threading.Event()
+        # Called from the interrupt thread whenever an event is queued
+        self._queue_notify = [self._queue_ready.set]
+        self._dropped = 0
+        self._deliver = self._enqueue if queue_size else self._dispatch
+
+        # Move coalescing: last delivered event and time per touch ID, plus the latest held back move
+        self._coalesce = coalesce
+        self._coalesce_last = {}
+        self._coalesce_time = {}
+        self._coalesce_pending = {}
+
+        self._emit = self._coalesce_event if coalesce else self._deliver
+
+        # Reports are read straight into a preallocated buffer by pointing
+        # a reusable i2c_msg at it, so reading and decoding don't allocate.
+        # With hardware gestures the gesture ID register, just before the touch count,
+        # is read too and everything after it in the buffer moves along by one.
+        self._report_offset = 1 if self._hardware_gestures else 0
+        report_size = REPORT_SIZE + self._report_offset
+        self._record_slots = tuple((slot, offset + self._report_offset) for slot, offset in _TOUCH_RECORD_SLOTS)
+        self._reads_per_report = 1 if fast_read else 2 + self._report_offset
+        self._report = bytearray(report_size)
+        self._msg_register = smbus2.i2c_msg.write(self._i2c_addr, [REG_GESTURE_ID if self._hardware_gestures else REG_TOUCH_COUNT])
+        self._msg_report = smbus2.i2c_msg.read(self._i2c_addr, report_size)
+        self._msg_report.buf = (ctypes.c_char * report_size).from_buffer(self._report)
+
+        self._stop = threading.Event()
 
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self._interrupt_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        GPIO.add_event_detect(self._interrupt_pin, edge=GPIO.FALLING, callback=self._handle_interrupt, bouncetime=1)
+        self._recover = recover
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._recovering = False
+        self._recovery = None
+        self._errors = 0
+        self._recoveries = 0
+
+        # Controller registers to (re)write on start up and after recovery
+        self._init_registers = {}
+        if auto_sleep is not None:
+            self._init_registers[REG_DIS_AUTO_SLEEP] = 0x00 if auto_sleep else 0x01
+        if report_period is not None:
+            self._init_registers[REG_NOR_SCAN_PER] = report_period
+        if gesture_only:
+            self._init_registers[REG_IRQ_CTL] = IRQ_EN_MOTION
+            self._init_registers[REG_MOTION_MASK] = MOTION_D_CLICK
+        try:
+            self._init_controller()
+        except (IOError, OSError):
+            # The controller may still be booting, recover it in the background like a failed read,
+            # ignoring interrupts until the recovery thread starts once everything is set up
+            self._read_failed()
+            if not recover:
+                raise
+            self._recovering = True
+
+        if interrupt is None:
+            if polling:
+                interrupt = PollingInterrupt(polling_interval, polling_idle_interval)
+            else:
+                interrupt = GPIOInterrupt(interrupt_pin)
+        self._interrupt = interrupt
+        self._interrupt.start(self._handle_interrupt)
+
+        self._dispatcher = None
+        if dispatch:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop)
+            self._dispatcher.daemon = True
+            self._dispatcher.start()
+
+        if self._recovering:
+            self._start_recovery()
 
     def on_touch(self, handler):
+        """Set a handler to be called with touch_id, x, y and state for each touch event."""
         self._callback_handler = handler
 
-    def _handle_interrupt(self, pin):
-        count = self._bus.read_byte_data(self._i2c_addr, 0x02)
-        # We don't get release events unless we always read both touches
-        count = 2
-        if count > 0:
-            data = self._bus.read_i2c_block_data(self._i2c_addr, 0x03, count * 6)
-            for i in range(count):
-                offset = i * 6
-                touch_status = False
-                touch = data[offset:offset + 6]
-                touch_event = touch[0] & 0xf0
-                touch_id = (touch[2] & 0xf0) >> 4
-                touch[0] &= 0x0f  # Mask out event_flg
-                touch[2] &= 0x0f  # Mask out touch_ID
-                tx, ty, p1, p2 = struct.unpack(">HHBB", bytes(touch))
-
-                if touch_event & 128:
-                    touch_status = True
-
-                if touch_event & 64:
-                    touch_status = False
-
-                new_touch = touch_id, tx, ty, touch_status
-
-                current_touch = self._touches.get(touch_id, None)
-
-                if new_touch != current_touch:
-                    self._touches[touch_id] = new_touch
-                    if callable(self._callback_handler):
-                        self._callback_handler(*self._touches[touch_id])
+    def on_touch_event(self, handler):
+        """Set a handler to be called with a TouchEvent, including timestamps, for each touch event."""
+        self._event_handler = handler
+
+    def on_gesture(self, handler):
+        """Set a handler to be called with a hyperpixel2r.gestures.Gesture for each hardware gesture.
+
+        Requires hardware_gestures=True or gesture_only=True. The handler is called
+        from the interrupt, even when touch events are queued.
+
+        """
+        self._gesture_handler = handler
+
+    def on_stats(self, handler):
+        """Set a handler to be called with the event, latency and callback time after each event is handled.
+
+        Requires stats=True.
+
+        """
+        self._stats_handler = handler
+
+    def stats(self, reset=False):
+        """Return a snapshot of the driver's counters and timing histograms as a dict.
+
+        Times are in seconds. Requires stats=True.
+
+        :param reset: reset the counters and histograms after taking the snapshot
+
+        """
+        if self._stats is None:
+            raise RuntimeError("Touch stats are only collected when stats=True")
+
+        snapshot = self._stats.snapshot()
+        if reset:
+            self._stats.reset()
+        return snapshot
+
+    def configure(self, verify=True, **settings):
+        """Write the touch controller's configuration registers.
+
+        Settings are kept and written again whenever the controller is recovered.
+
+        :param verify: read each register back and raise RuntimeError if it doesn't match
+        :param motion_mask: MOTION_* bits, gestures the controller recognises
+        :param irq_pulse_width: interrupt pulse width in units of 0.1ms (1 to 200)
+        :param report_period: report period while touched in units of 10ms (1 to 30)
+        :param auto_sleep_time: seconds without a touch before entering low power mode
+        :param irq_ctl: IRQ_EN_* and IRQ_ONCE_WLP bits, activity that pulses the interrupt line
+        :param long_press_time: seconds to hold for a long press gesture, 0 disables it
+        :param disable_auto_sleep: non-zero to stop the controller entering low power mode
+
+        """
+        registers = dict(CONFIG_REGISTERS)
+        unknown = set(settings) - set(registers)
+        if unknown:
+            raise ValueError("Unknown settings: {}".format(", ".join(sorted(unknown))))
+
+        for name, register in CONFIG_REGISTERS:
+            if name not in settings:
+                continue
+            value = settings[name]
+            self._bus.write_byte_data(self._i2c_addr, register, value)
+            self._init_registers[register] = value
+            if verify:
+                readback = self._bus.read_byte_data(self._i2c_addr, register)
+                if readback != value:
+                    raise RuntimeError("Touch controller {} (0x{:02x}) read back 0x{:02x}, expected 0x{:02x}".format(name, register, readback, value))
+
+    def config(self):
+        """Read the touch controller's configuration registers, returns a dict of settings for configure()."""
+        return dict((name, self._bus.read_byte_data(self._i2c_addr, register)) for name, register in CONFIG_REGISTERS)
+
+    @property
+    def dropped(self):
+        """Number of queued events discarded because the queue was full."""
+        return self._dropped
+
+    @property
+    def errors(self):
+        """Number of failed touch report reads, including retries and recovery attempts."""
+        return self._errors
+
+    @property
+    def recoveries(self):
+        """Number of times the controller has been recovered after an i2c error."""
+        return self._recoveries
+
+    def close(self):
+        """Stop handling interrupts, shut down the polling and dispatch threads and close a bus opened by number."""
+        self._stop.set()
+        self._interrupt.stop()
+        if self._recovery is not None:
+            self._recovery.join()
+            self._recovery = None
+        if self._dispatcher is not None:
+            self._queue_ready.set()
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._bus_number is not None:
+            self._bus.close()
+
+    def events(self):
+        """Yield queued TouchEvents until the queue is empty."""
+        if self._queue is None:
+            raise RuntimeError("Touch events are only queued when queue_size is set")
+
+        queue = self._queue
+        while True:
+            try:
+                yield queue.popleft()
+            except IndexError:
+                return
+
+    def poll(self):
+        """Pass all queued events to the on_touch and on_touch_event handlers.
+
+        Returns the number of events handled.
+
+        """
+        count = 0
+        for event in self.events():
+            self._dispatch(event)
+            count += 1
+        return count
+
+    def _dispatch(self, event):
+        stats = self._stats
+        if stats is not None:
+            t_start = monotonic()
+
+        if callable(self._callback_handler):
+            self._callback_handler(event.touch_id, event.x, event.y, event.state)
+        if callable(self._event_handler):
+            self._event_handler(event)
+
+        if stats is not None:
+            latency = t_start - event.timestamp
+            callback_time = monotonic() - t_start
+            stats.dispatched += 1
+            stats.latency.add(latency)
+            stats.callback_time.add(callback_time)
+            if callable(self._stats_handler):
+                self._stats_handler(event, latency, callback_time)
+
+    def _enqueue(self, event):
+        queue = self._queue
+        if self._queue_coalesce:
+            try:
+                last = queue[-1]
+                if last.touch_id == event.touch_id and last.state == event.state:
+                    queue[-1] = event
+                    return
+            except IndexError:
+                # The consumer emptied the queue under us, just append
+                pass
+
+        if len(queue) == queue.maxlen:
+            self._dropped += 1
+            if self._stats is not None:
+                self._stats.dropped += 1
+        queue.append(event)
+        for notify in self._queue_notify:
+            notify()
+
+    def _coalesce_event(self, event):
+        touch_id = event.touch_id
+        now = event.read_timestamp
+        last = self._coalesce_last.get(touch_id)
+        if event.state and last is not None and last.state and now - self._coalesce_time[touch_id] < self._coalesce:
+            # A move within the window, hold it back in place of any earlier one
+            self._coalesce_pending[touch_id] = event
+            return
+
+        self._coalesce_pending.pop(touch_id, None)
+        self._coalesce_last[touch_id] = event
+        self._coalesce_time[touch_id] = now
+        self._deliver(event)
+
+    def _flush_coalesced(self):
+        """Deliver held back moves whose coalescing window has expired."""
+        now = monotonic()
+        for touch_id, event in list(self._coalesce_pending.items()):
+            if now - self._coalesce_time[touch_id] >= self._coalesce:
+                del self._coalesce_pending[touch_id]
+                self._coalesce_last[touch_id] = event
+                self._coalesce_time[touch_id] = now
+                self._deliver(event)
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            self._queue_ready.wait()
+            self._queue_ready.clear()
+            self.poll()
+
+    def _read_report(self):
+        """Read the touch count and all touch records into the report buffer."""
+        # Every transaction is counted as it's attempted, so failed and retried reads are too
+        stats = self._stats
+        if self._fast_read:
+            # The touch count register sits directly before the touch records,
+            # so a single transfer starting at 0x02 (or 0x01) fetches everything at once.
+            if stats is not None:
+                stats.i2c_reads += 1
+            self._bus.i2c_rdwr(self._msg_register, self._msg_report)
+            return
+
+        offset = self._report_offset
+        if offset:
+            if stats is not None:
+                stats.i2c_reads += 1
+            self._report[0] = self._bus.read_byte_data(self._i2c_addr, REG_GESTURE_ID)
+        if stats is not None:
+            stats.i2c_reads += 1
+        self._report[offset] = self._bus.read_byte_data(self._i2c_addr, REG_TOUCH_COUNT)
+        if stats is not None:
+            stats.i2c_reads += 1
+        self._report[offset + 1:] = bytearray(self._bus.read_i2c_block_data(self._i2c_addr, REG_TOUCH_DATA, MAX_TOUCHES * TOUCH_RECORD_SIZE))
+
+    def _handle_interrupt(self, timestamp=None):
+        """Read and decode a touch report, returns True while any touch is down."""
+        if timestamp is None:
+            timestamp = monotonic()
+
+        # The recovery thread owns the bus until the controller responds again
+        if self._recovering:
+            return False
+
+        stats = self._stats
+        if stats is not None:
+            stats.interrupts += 1
+
+        try:
+            self._read_report()
+        except (IOError, OSError):
+            self._read_failed()
+            if not self._recover:
+                raise
+            if not self._retry_read():
+                return False
+
+        return self._decode_report(timestamp, monotonic())
+
+    def _init_controller(self):
+        for _, register in CONFIG_REGISTERS:
+            if register in self._init_registers:
+                self._bus.write_byte_data(self._i2c_addr, register, self._init_registers[register])
+
+    def _read_failed(self):
+        self._errors += 1
+        if self._stats is not None:
+            self._stats.i2c_errors += 1
+
+    def _retry_read(self):
+        """Retry a failed read, returns True if it succeeds, otherwise starts recovery."""
+        for _ in range(self._retries):
+            if self._stats is not None:
+                self._stats.i2c_retries += 1
+            try:
+                self._read_report()
+                return True
+            except (IOError, OSError):
+                self._read_failed()
+
+        self._start_recovery()
+        return False
+
+    def _start_recovery(self):
+        # Back off away from the interrupt thread so it's never blocked by a sleep
+        self._recovering = True
+        self._recovery = threading.Thread(target=self._recover_loop)
+        self._recovery.daemon = True
+        self._recovery.start()
+
+    def _recover_loop(self):
+        delay = self._backoff
+        while not self._stop.wait(delay):
+            try:
+                if self._bus_number is not None:
+                    try:
+                        self._bus.close()
+                    except (IOError, OSError):
+                        pass
+                    self._bus = smbus2.SMBus(self._bus_number)
+                self._init_controller()
+                self._read_report()
+            except (IOError, OSError):
+                self._read_failed()
+                delay = min(delay * 2, self._max_backoff)
+                continue
+
+            # Catch up on anything that changed, eg: releases, while the bus was down
+            self._decode_report(monotonic(), monotonic())
+            self._recoveries += 1
+            if self._stats is not None:
+                self._stats.recoveries += 1
+            self._recovering = False
+            return
+
+    @staticmethod
+    def _hardware_gesture_map(transform):
+        """Map hardware gesture IDs to gestures, with swipe directions turned to match the transform."""
+        from .gestures import (Gesture, GESTURE_SWIPE, GESTURE_TAP, GESTURE_DOUBLE_TAP, GESTURE_LONG_PRESS,
+                               SWIPE_UP, SWIPE_DOWN, SWIPE_LEFT, SWIPE_RIGHT)
+
+        def direction(dx, dy):
+            (a, b, _), (d, e, _) = transform.matrix
+            dx, dy = a * dx + b * dy, d * dx + e * dy
+            if abs(dx) > abs(dy):
+                return SWIPE_RIGHT if dx > 0 else SWIPE_LEFT
+            return SWIPE_DOWN if dy > 0 else SWIPE_UP
+
+        return Gesture, {
+            HW_GESTURE_SWIPE_UP: (GESTURE_SWIPE, direction(0, -1)),
+            HW_GESTURE_SWIPE_DOWN: (GESTURE_SWIPE, direction(0, 1)),
+            HW_GESTURE_SWIPE_LEFT: (GESTURE_SWIPE, direction(-1, 0)),
+            HW_GESTURE_SWIPE_RIGHT: (GESTURE_SWIPE, direction(1, 0)),
+            HW_GESTURE_CLICK: (GESTURE_TAP, None),
+            HW_GESTURE_DOUBLE_CLICK: (GESTURE_DOUBLE_TAP, None),
+            HW_GESTURE_LONG_PRESS: (GESTURE_LONG_PRESS, None),
+        }
+
+    def _emit_gesture(self, gesture_id, timestamp):
+        gesture_class, gestures = self._gestures
+        try:
+            gesture, direction = gestures[gesture_id]
+        except KeyError:
+            return
+        if not callable(self._gesture_handler):
+            return
+
+        # The gesture position is the first touch record
+        xh, yh, _, _ = _TOUCH_RECORD.unpack_from(self._report, self._record_slots[0][1])
+        x = xh & 0x0fff
+        y = yh & 0x0fff
+        if self._transform is not None:
+            a, b, c, d, e, f = self._transform
+            x, y = (a * x + b * y + c) >> 16, (d * x + e * y + f) >> 16
+        self._gesture_handler(gesture_class(gesture, x, y, timestamp, touch_id=yh >> 12, direction=direction))
+
+    def _decode_report(self, timestamp, read_timestamp):
+        """Decode the report buffer and emit changed touches, returns True while any touch is down."""
+        # The controller keeps reporting while a finger is down, so any held
+        # back move is delivered by a later report once its window has passed.
+        if self._coalesce_pending:
+            self._flush_coalesced()
+
+        report = self._report
+        if self._hardware_gestures:
+            gesture_id = report[0]
+            # Gestures like long press are reported for as long as they're held, so only
+            # changes count, unless the controller only interrupts on gestures anyway
+            if gesture_id != HW_GESTURE_NONE and (gesture_id != self._last_gesture or self._gesture_only):
+                self._emit_gesture(gesture_id, timestamp)
+            self._last_gesture = gesture_id
+            if self._gesture_only:
+                return report[1] > 0
+
+        slots = self._slots
+        transform = self._transform
+        apply_filter = self._filter
+        touching = False
+        # We don't get release events unless we always read both touches,
+        # so the touch count is ignored and every slot is decoded.
+        for slot, offset in self._record_slots:
+            xh, yh, p1, p2 = _TOUCH_RECORD.unpack_from(report, offset)
+            touch_id = yh >> 12
+            tx = xh & 0x0fff
+            ty = yh & 0x0fff
+            if transform is not None:
+                # Inline Transform.apply, fixed point with the rounding offset in c and f
+                a, b, c, d, e, f = transform
+                tx, ty = (a * tx + b * ty + c) >> 16, (d * tx + e * ty + f) >> 16
+            # event_flg is the top two bits of xh, only "contact" (0b10) counts as touched
+            touch_status = (xh & 0xc000) == 0x8000
+            touching = touching or touch_status
+
+            last = slots[slot]
+            if apply_filter is not None:
+                if touch_status:
+                    # Filter state restarts with each new contact
+                    reset = last is None or last.touch_id != touch_id or not last.state
+                    tx, ty = apply_filter(slot, tx, ty, timestamp, reset)
+                elif last is not None and last.state and last.touch_id == touch_id:
+                    # Lift where the filtered touch was, rather than jumping to the raw position
+                    tx, ty = last.x, last.y
+
+            # Compare against the slot's last event field by field, only allocating on change
+            if last is None or last.touch_id != touch_id or last.x != tx or last.y != ty or last.state != touch_status:
+                event = TouchEvent(touch_id, tx, ty, touch_status, timestamp, read_timestamp, p1, p2)
+                if self._polar is not None:
+                    event.angle, event.radius = self._polar.lookup(tx, ty)
+                slots[slot] = event
+                if self._stats is not None:
+                    self._stats.events += 1
+                self._emit(event)
+            elif self._stats is not None:
+                self._stats.duplicates += 1
+
+        return touching
+
+
+from .display import Display  # noqa: E402,F401
@@ -1,15 +1,66 @@
+import argparse
+import json
 import signal
+import time
+
+import smbus2
 
 from . import Touch
+from .replay import Recorder
+
+
+def format_stats(stats):
+    def ms(value):
+        return "-" if value is None else "{:.2f}".format(value * 1000)
+
+    return " ".join((
+        "interrupts={interrupts} reads={i2c_reads} errors={i2c_errors} retries={i2c_retries} recoveries={recoveries}".format(**stats),
+        "events={events} duplicates={duplicates} dropped={dropped}".format(**stats),
+        "latency p50/p99={}/{}ms".format(ms(stats['latency']['p50']), ms(stats['latency']['p99'])),
+        "callback p50/p99={}/{}ms".format(ms(stats['callback_time']['p50']), ms(stats['callback_time']['p99'])),
+    ))
 
 
 if __name__ == "__main__":
-    touch = Touch()
+    parser = argparse.ArgumentParser(description="HyperPixel 2 Round: Touch Test")
+    parser.add_argument("--stats", action="store_true", help="print driver counters and timings instead of touches")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between --stats updates")
+    parser.add_argument("--json", action="store_true", help="print --stats as JSON")
+    parser.add_argument("--record", metavar="FILE", help="record raw touch reports to FILE for replay")
+    parser.add_argument("--config", action="store_true", help="print the touch controller's configuration registers and exit")
+    args = parser.parse_args()
+
+    bus = 11
+    if args.record:
+        bus = Recorder(smbus2.SMBus(bus), args.record)
+        print("Recording touch reports to {}".format(args.record))
+
+    touch = Touch(bus=bus, stats=args.stats)
+
+    if args.config:
+        for name, value in sorted(touch.config().items()):
+            print("{:<20} 0x{:02x}".format(name, value))
+        touch.close()
+        raise SystemExit
 
     print("HyperPixel 2 Round: Touch Test")
 
     @touch.on_touch
     def handle_touch(touch_id, x, y, state):
-        print(touch_id, x, y, state)
+        if not args.stats:
+            print(touch_id, x, y, state)
 
-    signal.pause()
+    try:
+        if args.stats:
+            while True:
+                time.sleep(args.interval)
+                stats = touch.stats(reset=True)
+                print(json.dumps(stats, sort_keys=True) if args.json else format_stats(stats))
+        else:
+            signal.pause()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        touch.close()
+        if args.record:
+            bus.close()
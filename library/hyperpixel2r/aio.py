@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+from . import Touch
+
+
+class AsyncTouch(object):
+    def __init__(self, touch=None, queue_size=64, **kwargs):
+        """Expose touch events as an asyncio async iterator.
+
+        The interrupt thread only reads and queues touches, then wakes the
+        event loop through a pipe. No user code runs on the GPIO thread.
+
+        :param touch: an existing Touch instance created with queue_size set
+        :param queue_size: queue size for the Touch instance created when touch is not given
+        :param kwargs: any other arguments for the Touch instance created when touch is not given
+
+        """
+        self._owns_touch = touch is None
+        if touch is None:
+            touch = Touch(queue_size=queue_size, **kwargs)
+
+        if touch._queue is None:
+            raise ValueError("AsyncTouch requires a Touch created with queue_size set")
+
+        self._touch = touch
+        self._loop = None
+        self._waiter = None
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+        self._touch._queue_notify.append(self._wakeup)
+
+    @property
+    def touch(self):
+        return self._touch
+
+    def close(self):
+        """Stop waking the event loop and release the pipe."""
+        if self._wakeup in self._touch._queue_notify:
+            self._touch._queue_notify.remove(self._wakeup)
+        if self._loop is not None:
+            self._loop.remove_reader(self._read_fd)
+            self._loop = None
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.cancel()
+        if self._owns_touch:
+            self._touch.close()
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        queue = self._touch._queue
+        while True:
+            try:
+                return queue.popleft()
+            except IndexError:
+                pass
+
+            if self._loop is None:
+                self._loop = asyncio.get_event_loop()
+                self._loop.add_reader(self._read_fd, self._on_readable)
+
+            self._waiter = self._loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _wakeup(self):
+        # Runs in the interrupt thread, a full pipe already means a pending wakeup
+        try:
+            os.write(self._write_fd, b'\x00')
+        except BlockingIOError:
+            pass
+
+    def _on_readable(self):
+        try:
+            os.read(self._read_fd, 4096)
+        except BlockingIOError:
+            pass
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
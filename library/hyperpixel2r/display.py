@@ -0,0 +1,334 @@
+import errno
+import json
+import math
+import os
+import time
+
+from . import CENTER, RADIUS
+
+
+# SDL video drivers to try, in order, when $SDL_VIDEODRIVER isn't set
+DRIVERS = ('rpi', 'kmsdrm', 'fbcon', 'directfb', 'svgalib')
+
+
+class DirtyRects(object):
+    def __init__(self, width=480, height=480, max_rects=8, mask=None):
+        """Collect the areas of a frame that have changed since it was last displayed.
+
+        Rects are clipped to the screen and overlapping or touching rects are
+        merged. Past max_rects everything is merged into one bounding rect,
+        which is cheaper to push than many small ones.
+
+        :param width: screen width in pixels
+        :param height: screen height in pixels
+        :param max_rects: most rects to keep before merging them all
+        :param mask: a CircleMask to clip popped rects to, so nothing outside the round display is pushed
+
+        """
+        self.width = width
+        self.height = height
+        self.max_rects = max_rects
+        self.mask = mask
+        self._rects = []
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __iter__(self):
+        return iter(self._rects)
+
+    def add(self, rect):
+        """Mark an (x, y, width, height) rect, or a pygame.Rect, as changed."""
+        x, y, w, h = rect
+        x1 = max(0, x)
+        y1 = max(0, y)
+        x2 = min(self.width, x + w)
+        y2 = min(self.height, y + h)
+        if x2 <= x1 or y2 <= y1:
+            return
+
+        # Absorb every rect this one overlaps or touches, growing it as we go
+        merged = True
+        while merged:
+            merged = False
+            for other in self._rects:
+                ox, oy, ow, oh = other
+                if x1 <= ox + ow and ox <= x2 and y1 <= oy + oh and oy <= y2:
+                    x1, y1 = min(x1, ox), min(y1, oy)
+                    x2, y2 = max(x2, ox + ow), max(y2, oy + oh)
+                    self._rects.remove(other)
+                    merged = True
+                    break
+
+        self._rects.append((x1, y1, x2 - x1, y2 - y1))
+        if len(self._rects) > self.max_rects:
+            x1 = min(r[0] for r in self._rects)
+            y1 = min(r[1] for r in self._rects)
+            x2 = max(r[0] + r[2] for r in self._rects)
+            y2 = max(r[1] + r[3] for r in self._rects)
+            self._rects = [(x1, y1, x2 - x1, y2 - y1)]
+
+    def add_all(self):
+        """Mark the whole screen as changed."""
+        self._rects = [(0, 0, self.width, self.height)]
+
+    def pop(self):
+        """Return the changed rects and start over."""
+        rects = self._rects
+        self._rects = []
+        if self.mask is not None:
+            rects = self.mask.clip(rects)
+        return rects
+
+
+class CircleMask(object):
+    def __init__(self, center=CENTER, radius=RADIUS, width=480, height=480, band=48):
+        """The visible part of the round display, as a span of pixels per row.
+
+        Roughly a fifth of the 480x480 frame is outside the circle and never seen.
+        Rows are also grouped into bands of rects that cover the circle, for
+        work that's better done in a few big pieces than row by row.
+
+        :param center: center of the visible circle, which is 7px below the middle of the frame
+        :param radius: radius of the visible circle
+        :param width: frame width in pixels
+        :param height: frame height in pixels
+        :param band: rows per band, fewer bigger bands waste pixels but cost less per blit
+
+        """
+        cx, cy = center
+        spans = []
+        for y in range(height):
+            # A pixel is visible if its middle is inside the circle
+            dy = y + 0.5 - cy
+            if abs(dy) >= radius:
+                spans.append((0, 0))
+                continue
+            dx = math.sqrt(radius * radius - dy * dy)
+            x1 = max(0, int(math.ceil(cx - dx - 0.5)))
+            x2 = min(width, int(math.floor(cx + dx - 0.5)) + 1)
+            spans.append((x1, x2))
+
+        self.spans = tuple(spans)
+        self.visible = sum(x2 - x1 for x1, x2 in spans)
+
+        bands = []
+        for y in range(0, height, band):
+            rows = [(row, x1, x2) for row, (x1, x2) in enumerate(spans[y:y + band], y) if x2 > x1]
+            if rows:
+                x1 = min(x1 for _, x1, _ in rows)
+                x2 = max(x2 for _, _, x2 in rows)
+                bands.append((x1, rows[0][0], x2 - x1, rows[-1][0] + 1 - rows[0][0]))
+        self.bands = tuple(bands)
+
+    def clip(self, rects):
+        """Clip (x, y, width, height) rects, or pygame.Rects, to the bands covering the circle."""
+        clipped = []
+        for x, y, w, h in rects:
+            for bx, by, bw, bh in self.bands:
+                x1, y1 = max(x, bx), max(y, by)
+                x2, y2 = min(x + w, bx + bw), min(y + h, by + bh)
+                if x2 > x1 and y2 > y1:
+                    clipped.append((x1, y1, x2 - x1, y2 - y1))
+        return clipped
+
+
+def default_cache():
+    """Where Display caches the video driver that worked, $XDG_CACHE_HOME/hyperpixel2r/display.json."""
+    cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'hyperpixel2r', 'display.json')
+
+
+class Display(object):
+    def __init__(self, drivers=DRIVERS, cache=None, framebuffer=None, mask=None):
+        """Set up pygame for the round display, with SDL or by drawing straight to the framebuffer.
+
+        The driver in $SDL_VIDEODRIVER is used if set, otherwise each of drivers is
+        tried in turn, and if none work a 480x480 Surface is drawn then blitted to a
+        Framebuffer. Probing a driver that isn't there can take a while, so the one
+        that worked, and the screen size it was set up with, are cached on disk and
+        tried first next time. A stale cache falls back to probing again.
+
+        SDL reports the display as 480x480 in some modes, which offsets it, so 640x480 is used instead.
+
+        :param drivers: SDL video drivers to try, in order
+        :param cache: path of the driver cache, defaults to default_cache(), or False not to cache
+        :param framebuffer: a hyperpixel2r.framebuffer.Framebuffer to fall back to,
+            defaults to opening $SDL_FBDEV or /dev/fb0
+        :param mask: a CircleMask for the fallback Framebuffer and to clip dirty rects to
+
+        """
+        t_start = time.time()
+        self.mask = mask
+        self.cache = default_cache() if cache is None else cache
+        self.cached = False
+        self.screen = None
+        self.driver = None
+        self.framebuffer = None
+        # (driver, seconds, error or None) for each driver tried, in order
+        self.probes = []
+        self.first_frame = None
+
+        if os.getenv('SDL_VIDEODRIVER'):
+            # Whatever the user asked for, don't second guess it or cache it
+            driver = os.getenv('SDL_VIDEODRIVER')
+            self._set_mode(driver)
+            self.probes.append((driver, time.time() - t_start, None))
+        else:
+            cached = self._load_cache()
+            if cached is not None:
+                driver, size = cached
+                if driver is None:
+                    self.cached = self._open_framebuffer(framebuffer)
+                else:
+                    self.cached = self._probe(driver, size)
+            if not self.cached:
+                tried = [driver for driver, _, _ in self.probes]
+                for driver in drivers:
+                    if driver not in tried and self._probe(driver):
+                        break
+                else:
+                    if not self._open_framebuffer(framebuffer):
+                        raise RuntimeError("No SDL video driver or framebuffer available")
+                self._save_cache()
+
+        self.width, self.height = self.screen.get_size()
+        self._t_start = t_start
+        # Seconds from creating the Display to the screen being ready to draw on
+        self.startup = time.time() - t_start
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def rawfb(self):
+        """True if drawing to the framebuffer directly instead of with SDL."""
+        return self.framebuffer is not None
+
+    @staticmethod
+    def _init_driver(driver):
+        import pygame
+
+        chosen = os.getenv('SDL_VIDEODRIVER')
+        os.environ['SDL_VIDEODRIVER'] = driver
+        try:
+            pygame.display.init()
+        finally:
+            # SDL only reads it on init, leaving it set would look like the user chose it
+            if chosen is None:
+                del os.environ['SDL_VIDEODRIVER']
+
+    def _set_mode(self, driver, size=None):
+        import pygame
+
+        self._init_driver(driver)
+        if size is None:
+            info = pygame.display.Info()
+            size = (info.current_w, info.current_h)
+            if size == (480, 480):  # Fix for 480x480 mode offset
+                size = (640, 480)
+        self.screen = pygame.display.set_mode(tuple(size), pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.NOFRAME | pygame.HWSURFACE)
+        self.driver = driver
+
+    def _probe(self, driver, size=None):
+        import pygame
+
+        t_start = time.time()
+        try:
+            self._set_mode(driver, size)
+        except pygame.error as e:
+            pygame.display.quit()
+            self.probes.append((driver, time.time() - t_start, str(e)))
+            return False
+        self.probes.append((driver, time.time() - t_start, None))
+        return True
+
+    def _open_framebuffer(self, framebuffer=None):
+        import pygame
+        from .framebuffer import Framebuffer
+
+        t_start = time.time()
+        try:
+            self.framebuffer = framebuffer or Framebuffer(mask=self.mask)
+        except (IOError, OSError) as e:
+            self.probes.append(('framebuffer', time.time() - t_start, str(e)))
+            return False
+        self.probes.append(('framebuffer', time.time() - t_start, None))
+        # Need to init for .convert() to work
+        self._init_driver('dummy')
+        self.screen = pygame.Surface((480, 480))
+        self.driver = None
+        return True
+
+    def _load_cache(self):
+        """Return the cached (driver, size), where a driver of None is the framebuffer, or None."""
+        if not self.cache:
+            return None
+        try:
+            with open(self.cache) as f:
+                cached = json.load(f)
+            return cached['driver'], cached['size']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_cache(self):
+        if not self.cache:
+            return
+        try:
+            try:
+                os.makedirs(os.path.dirname(self.cache))
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            with open(self.cache, 'w') as f:
+                json.dump({'driver': self.driver, 'size': list(self.screen.get_size())}, f)
+        except (IOError, OSError):
+            # A read-only filesystem just means probing again next time
+            pass
+
+    def update(self, rects=None):
+        """Display the screen, or just the given rects of it, eg: from DirtyRects.pop().
+
+        :param rects: (x, y, width, height) rects, or pygame.Rects, to update instead of the whole screen
+
+        """
+        import pygame
+
+        if self.framebuffer is not None:
+            self.framebuffer.blit(self.screen, rects)
+        elif rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+        if self.first_frame is None:
+            # Seconds from creating the Display to the first frame being displayed
+            self.first_frame = time.time() - self._t_start
+
+    def report(self):
+        """Describe each driver tried, the one used and how long start up took, eg: to print or log."""
+        lines = []
+        for driver, seconds, error in self.probes:
+            result = 'failed: {0}'.format(error) if error else 'ok'
+            lines.append('{0}: {1} in {2:.1f}ms'.format(driver, result, seconds * 1000))
+        backend = 'framebuffer {0}'.format(self.framebuffer.device) if self.rawfb else 'SDL driver {0}'.format(self.driver)
+        lines.append('Using {0}{1}, {2:d} x {3:d}, ready in {4:.1f}ms'.format(
+            backend, ' (cached)' if self.cached else '', self.width, self.height, self.startup * 1000))
+        if self.first_frame is not None:
+            lines.append('First frame in {0:.1f}ms'.format(self.first_frame * 1000))
+        return '\n'.join(lines)
+
+    def dirty_rects(self, max_rects=8):
+        """Return a DirtyRects for the visible 480x480 area, clipped to the mask if there is one."""
+        return DirtyRects(max_rects=max_rects, mask=self.mask)
+
+    def close(self):
+        import pygame
+
+        if self.framebuffer is not None:
+            self.framebuffer.close()
+            self.framebuffer = None
+        pygame.quit()
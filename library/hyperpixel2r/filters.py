@@ -0,0 +1,130 @@
+import math
+
+
+# Matches the number of touch slots the controller reports
+SLOTS = 2
+
+
+class Filter(object):
+    def __init__(self, slots=SLOTS):
+        """Base class for touch coordinate filters, which passes positions through unchanged.
+
+        Filters keep their state in preallocated per-slot lists, apply() is
+        called from the interrupt for every report while a finger is down.
+        A lift is reported at the last filtered position.
+
+        """
+        self._slots = slots
+
+    def apply(self, slot, x, y, timestamp, reset):
+        """Filter a touch position, returns the filtered (x, y).
+
+        :param slot: controller touch slot
+        :param x: raw x position
+        :param y: raw y position
+        :param timestamp: time of the report in seconds
+        :param reset: True when this is a new touch and any previous state should be discarded
+
+        """
+        return x, y
+
+
+class DeadZone(Filter):
+    def __init__(self, radius=3, slots=SLOTS):
+        """Hold a touch still until it moves more than radius pixels from where it was last reported.
+
+        :param radius: distance in pixels a touch must move before its position changes
+
+        """
+        Filter.__init__(self, slots)
+        self.radius = radius
+        self._radius_squared = radius * radius
+        self._x = [0] * slots
+        self._y = [0] * slots
+
+    def apply(self, slot, x, y, timestamp, reset):
+        if not reset:
+            dx = x - self._x[slot]
+            dy = y - self._y[slot]
+            if dx * dx + dy * dy <= self._radius_squared:
+                return self._x[slot], self._y[slot]
+        self._x[slot] = x
+        self._y[slot] = y
+        return x, y
+
+
+class EMA(Filter):
+    def __init__(self, alpha=0.5, slots=SLOTS):
+        """Exponential moving average.
+
+        :param alpha: weight of each new position, from 0 (never move) to 1 (no smoothing)
+
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be greater than 0 and at most 1")
+        Filter.__init__(self, slots)
+        self.alpha = alpha
+        self._x = [0.0] * slots
+        self._y = [0.0] * slots
+
+    def apply(self, slot, x, y, timestamp, reset):
+        if reset:
+            self._x[slot] = float(x)
+            self._y[slot] = float(y)
+            return x, y
+        alpha = self.alpha
+        fx = self._x[slot] = self._x[slot] + alpha * (x - self._x[slot])
+        fy = self._y[slot] = self._y[slot] + alpha * (y - self._y[slot])
+        return int(round(fx)), int(round(fy))
+
+
+class OneEuro(Filter):
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, rate=100, slots=SLOTS):
+        """One Euro filter, heavy smoothing while a touch is slow and little lag while it's fast.
+
+        See: Casiez, Roussel and Vogel, "1 Euro Filter", CHI 2012.
+
+        :param min_cutoff: cutoff frequency in Hz at rest, lower removes more jitter
+        :param beta: how quickly the cutoff rises with speed, higher reduces lag
+        :param d_cutoff: cutoff frequency in Hz for the speed estimate
+        :param rate: report rate in Hz to assume when timestamps don't advance
+
+        """
+        Filter.__init__(self, slots)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._default_dt = 1.0 / rate
+        self._x = [0.0] * slots
+        self._y = [0.0] * slots
+        self._dx = [0.0] * slots
+        self._dy = [0.0] * slots
+        self._t = [0.0] * slots
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def apply(self, slot, x, y, timestamp, reset):
+        if reset:
+            self._x[slot] = float(x)
+            self._y[slot] = float(y)
+            self._dx[slot] = self._dy[slot] = 0.0
+            self._t[slot] = timestamp
+            return x, y
+
+        dt = timestamp - self._t[slot]
+        if dt <= 0:
+            dt = self._default_dt
+        self._t[slot] = timestamp
+
+        # Smoothed speed drives the position cutoff
+        alpha = self._alpha(self.d_cutoff, dt)
+        dx = self._dx[slot] = self._dx[slot] + alpha * ((x - self._x[slot]) / dt - self._dx[slot])
+        dy = self._dy[slot] = self._dy[slot] + alpha * ((y - self._y[slot]) / dt - self._dy[slot])
+
+        alpha = self._alpha(self.min_cutoff + self.beta * math.sqrt(dx * dx + dy * dy), dt)
+        fx = self._x[slot] = self._x[slot] + alpha * (x - self._x[slot])
+        fy = self._y[slot] = self._y[slot] + alpha * (y - self._y[slot])
+        return int(round(fx)), int(round(fy))
@@ -0,0 +1,203 @@
+import fcntl
+import mmap
+import os
+import struct
+
+
+FBIOGET_VSCREENINFO = 0x4600
+FBIOGET_FSCREENINFO = 0x4602
+
+# fb_var_screeninfo: xres, yres, xres_virtual, yres_virtual, xoffset, yoffset, bits_per_pixel,
+# grayscale, then offset, length and msb_right for each of red, green, blue and transp
+_VSCREENINFO = struct.Struct("=20I")
+# fb_fix_screeninfo: id, smem_start, smem_len, type, type_aux, visual, xpanstep, ypanstep, ywrapstep, line_length
+_FSCREENINFO = struct.Struct("@16sLIIIIHHHI")
+# Big enough for either structure on 32 and 64 bit kernels
+_SCREENINFO_SIZE = 160
+
+DEFAULT_MASKS = {
+    16: (0xf800, 0x07e0, 0x001f, 0),
+    32: (0xff0000, 0x00ff00, 0x0000ff, 0),
+}
+
+
+def _ioctl(fd, request):
+    buf = bytearray(_SCREENINFO_SIZE)
+    fcntl.ioctl(fd, request, buf, True)
+    return buf
+
+
+class Framebuffer(object):
+    def __init__(self, device=None, width=None, height=None, bpp=None, stride=None, converter=None, mask=None):
+        """Memory map a Linux framebuffer device for direct drawing.
+
+        The device is opened and mapped once, with its geometry read from the
+        FBIOGET_VSCREENINFO and FBIOGET_FSCREENINFO ioctls. Anything passed in
+        overrides the ioctls, and if they fail (eg: for a regular file standing
+        in for the device) width and height are required.
+
+        A panned or double buffered framebuffer is drawn to at the x and y offset
+        of the page displayed when it's opened, rather than the start of its memory.
+
+        :param device: framebuffer device, defaults to $SDL_FBDEV or /dev/fb0
+        :param width: visible width in pixels
+        :param height: visible height in pixels
+        :param bpp: bits per pixel, 16 (RGB565) or 32 (XRGB8888)
+        :param stride: bytes per row, defaults to width * bpp / 8
+        :param converter: a hyperpixel2r.rgb565.RGB565Converter to convert with NumPy straight into
+            the mapped memory of a 16bpp framebuffer, eg: for dithering, otherwise pygame converts
+        :param mask: a hyperpixel2r.display.CircleMask, pixels outside it aren't converted,
+            or copied unless that means copying whole rows instead of row by row
+
+        """
+        self.device = device or os.getenv('SDL_FBDEV', '/dev/fb0')
+        self._fd = os.open(self.device, os.O_RDWR)
+        self.masks = None
+        xoffset = yoffset = 0
+
+        try:
+            var = _VSCREENINFO.unpack_from(_ioctl(self._fd, FBIOGET_VSCREENINFO))
+            fix = _FSCREENINFO.unpack_from(_ioctl(self._fd, FBIOGET_FSCREENINFO))
+            width = width or var[0]
+            height = height or var[1]
+            bpp = bpp or var[6]
+            stride = stride or fix[9]
+            xoffset, yoffset = var[4:6]
+            if bpp == var[6]:
+                self.masks = tuple(((1 << length) - 1) << offset for offset, length in (var[8:10], var[11:13], var[14:16], var[17:19]))
+        except (IOError, OSError):
+            if not width or not height:
+                os.close(self._fd)
+                raise
+
+        self.width = width
+        self.height = height
+        self.bpp = bpp or 16
+        self.stride = stride or width * self.bpp // 8
+        self.masks = self.masks or DEFAULT_MASKS[self.bpp]
+        self.size = self.stride * self.height
+        # Where the displayed page starts, the mapping is from the start of memory as it has to be page aligned
+        self.offset = yoffset * self.stride + xoffset * self.bpp // 8
+
+        self._mmap = mmap.mmap(self._fd, self.offset + self.size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        if converter is not None and (self.bpp != 16 or self.masks != DEFAULT_MASKS[16]):
+            raise ValueError("RGB565Converter requires an RGB565 framebuffer")
+        self._converter = converter
+        self._mask = mask
+        # Surfaces are converted into this, allocated once on the first blit
+        self._surface = None
+        self._pixels = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def buffer(self):
+        """The mapped framebuffer memory, stride bytes per row, with the displayed page at offset."""
+        return self._mmap
+
+    @property
+    def pixels(self):
+        """The visible area of a 16bpp framebuffer as a (height, width) NumPy uint16 array."""
+        if self._pixels is None:
+            import numpy
+
+            if self.bpp != 16:
+                raise RuntimeError("Framebuffer pixels are only available at 16bpp")
+            rows = numpy.frombuffer(self._mmap, dtype=numpy.uint16, count=self.size // 2, offset=self.offset).reshape(self.height, self.stride // 2)
+            self._pixels = rows[:, :self.width]
+        return self._pixels
+
+    def blit(self, surface, rects=None):
+        """Copy a pygame Surface to the top left of the framebuffer, converting it to the framebuffer's pixel format.
+
+        :param surface: the surface to display
+        :param rects: (x, y, width, height) rects, or pygame.Rects, to copy instead of the whole surface,
+            eg: from hyperpixel2r.display.DirtyRects, only these rows and columns are written
+
+        """
+        import pygame
+
+        width = min(surface.get_width(), self.width)
+        height = min(surface.get_height(), self.height)
+        if (width, height) != surface.get_size():
+            surface = surface.subsurface((0, 0, width, height))
+
+        if rects is None:
+            rects = [(0, 0, width, height)]
+        else:
+            rects = [clipped for clipped in (self._clip(rect, width, height) for rect in rects) if clipped]
+
+        if self._converter is not None:
+            # NumPy's per call overhead outweighs the pixels saved by converting the mask's bands
+            for x, y, w, h in rects:
+                self._converter.convert(surface, self.pixels[y:y + h, x:x + w], (x, y, w, h))
+            return
+
+        if self._mask is not None:
+            rects = self._mask.clip(rects)
+
+        if self._surface is None or self._surface.get_size() != (width, height):
+            self._surface = pygame.Surface((width, height), 0, self.bpp, self.masks)
+
+        for rect in rects:
+            self._surface.blit(surface, rect[:2], rect)
+        self._copy(self._surface, rects)
+
+    @staticmethod
+    def _clip(rect, width, height):
+        x, y, w, h = rect
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(width, x + w), min(height, y + h)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2 - x1, y2 - y1
+
+    def _copy(self, surface, rects):
+        """Copy rects of a surface already in the framebuffer's pixel format, a row span at a time."""
+        pitch = surface.get_pitch()
+        stride = self.stride
+        offset = self.offset
+        depth = self.bpp // 8
+        spans = self._mask.spans if self._mask is not None else None
+        # The view locks the surface, it has to be released before the next blit
+        view = surface.get_view('0')
+        data = memoryview(view)
+        try:
+            for x, y, w, h in rects:
+                if spans is None:
+                    whole_rows = x == 0 and w * depth == pitch
+                else:
+                    # Masked rects can copy whole rows if they cover everything visible in them,
+                    # what's outside the mask is never seen
+                    visible = [span for span in spans[y:y + h] if span[1] > span[0]]
+                    whole_rows = all(x <= x1 and x2 <= x + w for x1, x2 in visible)
+                if whole_rows and pitch == stride:
+                    # Whole rows are contiguous in both, copy them in one go
+                    self._mmap[offset + y * stride:offset + (y + h) * stride] = data[y * pitch:(y + h) * pitch]
+                    continue
+                start = x * depth
+                end = start + w * depth
+                for row in range(y, y + h):
+                    if spans is not None:
+                        # Masked rows only copy their visible span
+                        x1, x2 = spans[row]
+                        start = max(x, x1) * depth
+                        end = min(x + w, x2) * depth
+                        if end <= start:
+                            continue
+                    self._mmap[offset + row * stride + start:offset + row * stride + end] = data[row * pitch + start:row * pitch + end]
+        finally:
+            del data
+            del view
+
+    def close(self):
+        if self._mmap is not None:
+            # The NumPy view has to go before the mapping can be closed
+            self._pixels = None
+            self._mmap.close()
+            self._mmap = None
+            os.close(self._fd)
@@ -0,0 +1,287 @@
+import math
+
+from . import CENTER, MAX_TOUCHES
+from .polar import PolarMap, polar
+
+
+GESTURE_TAP = 'tap'
+GESTURE_DOUBLE_TAP = 'double_tap'
+GESTURE_LONG_PRESS = 'long_press'
+GESTURE_SWIPE = 'swipe'
+GESTURE_PINCH = 'pinch'
+GESTURE_ROTATE = 'rotate'
+GESTURE_DIAL = 'dial'
+
+SWIPE_UP = 'up'
+SWIPE_DOWN = 'down'
+SWIPE_LEFT = 'left'
+SWIPE_RIGHT = 'right'
+
+
+def dial_angle(x, y, center=CENTER):
+    """Angle of a point around the center in degrees, clockwise from 12 o'clock (0 to 360)."""
+    return polar(x, y, center)[0]
+
+
+def _angle_delta(a, b):
+    """Shortest signed difference between two angles in degrees (-180 to 180)."""
+    return (b - a + 180) % 360 - 180
+
+
+class Gesture(object):
+    """A recognised gesture.
+
+    * gesture - one of the GESTURE_ constants
+    * x, y - where the gesture happened, the midpoint of both touches for pinch and rotate
+    * timestamp - monotonic time of the touch event that completed the gesture
+    * touch_id - the touch that made the gesture, None for two finger gestures
+    * direction - SWIPE_UP, SWIPE_DOWN, SWIPE_LEFT or SWIPE_RIGHT for swipes
+    * velocity - swipe speed in pixels per second
+    * scale - pinch distance relative to when the second finger went down
+    * angle - rotation in degrees since the second finger went down, or the dial angle
+    * delta - change in angle since the previous rotate or dial gesture
+
+    """
+
+    __slots__ = ('gesture', 'x', 'y', 'timestamp', 'touch_id', 'direction', 'velocity', 'scale', 'angle', 'delta')
+
+    def __init__(self, gesture, x, y, timestamp, touch_id=None, direction=None, velocity=None, scale=None, angle=None, delta=None):
+        self.gesture = gesture
+        self.x = x
+        self.y = y
+        self.timestamp = timestamp
+        self.touch_id = touch_id
+        self.direction = direction
+        self.velocity = velocity
+        self.scale = scale
+        self.angle = angle
+        self.delta = delta
+
+    def __repr__(self):
+        values = ("{}={!r}".format(field, getattr(self, field)) for field in self.__slots__ if getattr(self, field) is not None)
+        return "Gesture({})".format(", ".join(values))
+
+
+class _Slot(object):
+    __slots__ = ('down', 'x', 'y', 'start_x', 'start_y', 'start_time', 'moved', 'long_pressed', 'dial_angle')
+
+    def __init__(self):
+        self.down = False
+        self.x = self.y = self.start_x = self.start_y = 0
+        self.start_time = 0.0
+        self.moved = False
+        self.long_pressed = False
+        self.dial_angle = None
+
+
+class GestureRecognizer(object):
+    def __init__(self, center=CENTER, tap_time=0.3, double_tap_time=0.3, long_press_time=0.6, slop=20,
+                 swipe_distance=60, swipe_velocity=300, pinch_threshold=0.05, rotate_threshold=5,
+                 dial=True, dial_inner_radius=0, dial_outer_radius=None):
+        """Streaming gesture recognizer for touch events.
+
+        Feed it every TouchEvent, for example with touch.on_touch_event(gestures.feed),
+        and set a handler with on_gesture. Each touch slot runs a small state machine,
+        so every event costs a constant amount of work.
+
+        :param center: center of the round display, for dial gestures
+        :param tap_time: maximum seconds between press and release for a tap
+        :param double_tap_time: maximum seconds between the release of a tap and the next tap for a double tap
+        :param long_press_time: seconds a touch must be held without moving for a long press
+        :param slop: pixels a touch can move and still count as a tap or long press
+        :param swipe_distance: minimum pixels moved between press and release for a swipe
+        :param swipe_velocity: minimum average pixels per second for a swipe
+        :param pinch_threshold: scale change from 1.0 before pinch gestures are reported
+        :param rotate_threshold: degrees of rotation before rotate gestures are reported
+        :param dial: report dial gestures for single touches around the center
+        :param dial_inner_radius: ignore dial touches closer to the center than this
+        :param dial_outer_radius: ignore dial touches further from the center than this
+
+        """
+        self._polar = PolarMap(center)
+        self._tap_time = tap_time
+        self._double_tap_time = double_tap_time
+        self._long_press_time = long_press_time
+        self._slop_squared = slop * slop
+        self._double_tap_distance_squared = 4 * slop * slop
+        self._swipe_distance_squared = swipe_distance * swipe_distance
+        self._swipe_velocity = swipe_velocity
+        self._pinch_threshold = pinch_threshold
+        self._rotate_threshold = rotate_threshold
+        self._dial = dial
+        self._dial_inner_radius = dial_inner_radius
+        self._dial_outer_radius = dial_outer_radius
+
+        # Touch IDs are 4 bits, but the controller only tracks MAX_TOUCHES at once
+        self._slots = [_Slot() for _ in range(16)]
+        self._down = []
+        self._handler = None
+
+        self._last_tap = None  # (time, x, y) of the last single tap, for double taps
+
+        # Two finger state, set while two touches are down
+        self._multi = False
+        self._multi_distance = 0.0
+        self._multi_angle = 0.0
+        self._multi_last_angle = 0.0
+        self._pinching = False
+        self._rotating = False
+
+    def on_gesture(self, handler):
+        """Set a handler to be called with each recognised Gesture."""
+        self._handler = handler
+
+    def _emit(self, gesture):
+        if callable(self._handler):
+            self._handler(gesture)
+
+    def feed(self, event):
+        """Process a TouchEvent."""
+        slot = self._slots[event.touch_id]
+        if event.state:
+            if slot.down:
+                self._move(event, slot)
+            else:
+                self._press(event, slot)
+        elif slot.down:
+            self._release(event, slot)
+
+    def update(self, timestamp):
+        """Check for long presses on touches that haven't moved since their last event.
+
+        The touch controller doesn't report a finger that is held still, so call
+        this regularly, such as once per frame, with the current monotonic time.
+
+        """
+        if len(self._down) == 1:
+            touch_id = self._down[0]
+            self._check_long_press(touch_id, self._slots[touch_id], timestamp)
+
+    def _press(self, event, slot):
+        slot.down = True
+        slot.x = slot.start_x = event.x
+        slot.y = slot.start_y = event.y
+        slot.start_time = event.timestamp
+        slot.moved = False
+        slot.long_pressed = False
+        slot.dial_angle = None
+        self._down.append(event.touch_id)
+
+        if len(self._down) == MAX_TOUCHES:
+            self._start_multi()
+        elif len(self._down) == 1:
+            self._update_dial(event, slot)
+
+    def _move(self, event, slot):
+        slot.x = event.x
+        slot.y = event.y
+        if not slot.moved:
+            dx = event.x - slot.start_x
+            dy = event.y - slot.start_y
+            slot.moved = dx * dx + dy * dy > self._slop_squared
+
+        if self._multi:
+            self._update_multi(event)
+        elif len(self._down) == 1:
+            self._check_long_press(event.touch_id, slot, event.timestamp)
+            self._update_dial(event, slot)
+
+    def _release(self, event, slot):
+        slot.down = False
+        slot.x = event.x
+        slot.y = event.y
+        self._down.remove(event.touch_id)
+
+        if self._multi:
+            # Finishing a two finger gesture never counts as a tap or swipe
+            slot.moved = True
+            if not self._down:
+                self._multi = False
+            return
+
+        if slot.long_pressed or self._down:
+            return
+
+        duration = event.timestamp - slot.start_time
+        dx = event.x - slot.start_x
+        dy = event.y - slot.start_y
+
+        if not slot.moved:
+            if duration >= self._long_press_time:
+                self._emit(Gesture(GESTURE_LONG_PRESS, event.x, event.y, event.timestamp, event.touch_id))
+            elif duration <= self._tap_time:
+                self._tap(event)
+            return
+
+        if dx * dx + dy * dy >= self._swipe_distance_squared and duration > 0:
+            velocity = math.sqrt(dx * dx + dy * dy) / duration
+            if velocity >= self._swipe_velocity:
+                if abs(dx) > abs(dy):
+                    direction = SWIPE_RIGHT if dx > 0 else SWIPE_LEFT
+                else:
+                    direction = SWIPE_DOWN if dy > 0 else SWIPE_UP
+                self._emit(Gesture(GESTURE_SWIPE, event.x, event.y, event.timestamp, event.touch_id, direction=direction, velocity=velocity))
+
+    def _tap(self, event):
+        last = self._last_tap
+        if last is not None and event.timestamp - last[0] <= self._double_tap_time:
+            dx = event.x - last[1]
+            dy = event.y - last[2]
+            if dx * dx + dy * dy <= self._double_tap_distance_squared:
+                self._last_tap = None
+                self._emit(Gesture(GESTURE_DOUBLE_TAP, event.x, event.y, event.timestamp, event.touch_id))
+                return
+
+        self._last_tap = (event.timestamp, event.x, event.y)
+        self._emit(Gesture(GESTURE_TAP, event.x, event.y, event.timestamp, event.touch_id))
+
+    def _check_long_press(self, touch_id, slot, timestamp):
+        if not slot.moved and not slot.long_pressed and timestamp - slot.start_time >= self._long_press_time:
+            slot.long_pressed = True
+            self._emit(Gesture(GESTURE_LONG_PRESS, slot.x, slot.y, timestamp, touch_id))
+
+    def _update_dial(self, event, slot):
+        if not self._dial:
+            return
+        angle, radius = self._polar.lookup(event.x, event.y)
+        if radius < self._dial_inner_radius:
+            return
+        if self._dial_outer_radius is not None and radius > self._dial_outer_radius:
+            return
+        delta = 0.0 if slot.dial_angle is None else _angle_delta(slot.dial_angle, angle)
+        slot.dial_angle = angle
+        self._emit(Gesture(GESTURE_DIAL, event.x, event.y, event.timestamp, event.touch_id, angle=angle, delta=delta))
+
+    def _pair(self):
+        a = self._slots[self._down[0]]
+        b = self._slots[self._down[1]]
+        dx = b.x - a.x
+        dy = b.y - a.y
+        return a, b, math.sqrt(dx * dx + dy * dy), math.degrees(math.atan2(dy, dx))
+
+    def _start_multi(self):
+        a, b, distance, angle = self._pair()
+        self._multi = True
+        self._multi_distance = max(distance, 1.0)
+        self._multi_angle = self._multi_last_angle = angle
+        self._pinching = False
+        self._rotating = False
+
+    def _update_multi(self, event):
+        if len(self._down) != MAX_TOUCHES:
+            return
+        a, b, distance, angle = self._pair()
+        x = (a.x + b.x) // 2
+        y = (a.y + b.y) // 2
+
+        scale = distance / self._multi_distance
+        if self._pinching or abs(scale - 1.0) >= self._pinch_threshold:
+            self._pinching = True
+            self._emit(Gesture(GESTURE_PINCH, x, y, event.timestamp, scale=scale))
+
+        rotation = _angle_delta(self._multi_angle, angle)
+        if self._rotating or abs(rotation) >= self._rotate_threshold:
+            self._rotating = True
+            delta = _angle_delta(self._multi_last_angle, angle)
+            self._multi_last_angle = angle
+            self._emit(Gesture(GESTURE_ROTATE, x, y, event.timestamp, angle=rotation, delta=delta))
@@ -0,0 +1,169 @@
+import threading
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2
+    from time import time as monotonic
+
+
+# BCM GPIO to physical pin numbers on the 40-pin header, for when
+# another library has already put RPi.GPIO into BOARD mode
+BCM_TO_BOARD = {
+    0: 27, 1: 28, 2: 3, 3: 5, 4: 7, 5: 29, 6: 31, 7: 26, 8: 24, 9: 21,
+    10: 19, 11: 23, 12: 32, 13: 33, 14: 8, 15: 10, 16: 36, 17: 11, 18: 12, 19: 35,
+    20: 38, 21: 40, 22: 15, 23: 16, 24: 18, 25: 22, 26: 37, 27: 13
+}
+
+
+class Interrupt(object):
+    """Tells Touch when the touch controller has a new report.
+
+    Subclasses implement start(handler), after which the source calls
+    handler(timestamp) for each report, where timestamp is a monotonic time
+    in seconds captured as close to the interrupt edge as the source allows.
+    The handler returns True while any touch is down. stop() stops calling
+    the handler, and does nothing unless the source has something to tear down.
+
+    """
+
+    def stop(self):
+        pass
+
+
+class GPIOInterrupt(Interrupt):
+    def __init__(self, pin=27, bouncetime=1):
+        """Interrupt from a falling edge on a GPIO pin, using RPi.GPIO.
+
+        :param pin: BCM pin connected to the touch interrupt line
+        :param bouncetime: RPi.GPIO edge detection bounce time in milliseconds
+
+        """
+        self.pin = pin
+        self._bouncetime = bouncetime
+        self._channel = None
+        self._GPIO = None
+
+    def start(self, handler):
+        import RPi.GPIO as GPIO
+        self._GPIO = GPIO
+
+        # Don't fight another library over the pin numbering mode
+        if GPIO.getmode() == GPIO.BOARD:
+            self._channel = BCM_TO_BOARD[self.pin]
+        else:
+            if GPIO.getmode() != GPIO.BCM:
+                GPIO.setmode(GPIO.BCM)
+            self._channel = self.pin
+
+        GPIO.setup(self._channel, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.add_event_detect(self._channel, edge=GPIO.FALLING, callback=lambda channel: handler(monotonic()), bouncetime=self._bouncetime)
+
+    def stop(self):
+        if self._channel is not None:
+            self._GPIO.remove_event_detect(self._channel)
+            self._channel = None
+
+
+class GPIODInterrupt(Interrupt):
+    def __init__(self, pin=27, chip='/dev/gpiochip0', consumer='hyperpixel2r-touch'):
+        """Interrupt from a falling edge on a GPIO line, using the libgpiod (v2) character device API.
+
+        Edge events are read in a dedicated thread and carry kernel
+        CLOCK_MONOTONIC timestamps, so they reflect the true edge time.
+
+        :param pin: line offset connected to the touch interrupt line
+        :param chip: path to the GPIO character device
+        :param consumer: consumer label for the line request
+
+        """
+        self.pin = pin
+        self._chip = chip
+        self._consumer = consumer
+        self._request = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, handler):
+        import gpiod
+        from gpiod.line import Bias, Edge
+
+        self._request = gpiod.request_lines(
+            self._chip,
+            consumer=self._consumer,
+            config={self.pin: gpiod.LineSettings(edge_detection=Edge.FALLING, bias=Bias.PULL_UP)}
+        )
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(handler, ))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._request is not None:
+            self._request.release()
+            self._request = None
+
+    def _run(self, handler):
+        request = self._request
+        while not self._stop.is_set():
+            # Time out periodically so stop() is noticed
+            if not request.wait_edge_events(0.1):
+                continue
+            events = request.read_edge_events()
+            if events:
+                # A single read catches up with every pending edge, timed from the oldest
+                handler(events[0].timestamp_ns / 1e9)
+
+
+class PollingInterrupt(Interrupt):
+    def __init__(self, interval=0.01, idle_interval=0.1):
+        """Read the touch controller from a timer thread, no interrupt pin needed.
+
+        :param interval: seconds between reads while a finger is down
+        :param idle_interval: seconds between reads while nothing is touched
+
+        """
+        self._interval = interval
+        self._idle_interval = idle_interval
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, handler):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(handler, ))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, handler):
+        # Read quickly while a finger is down and back off to the idle rate otherwise
+        interval = 0
+        while not self._stop.wait(interval):
+            touching = handler(monotonic())
+            interval = self._interval if touching else self._idle_interval
+
+
+class FakeInterrupt(Interrupt):
+    """Interrupt source for tests, call trigger() to simulate an interrupt."""
+
+    def __init__(self):
+        self._handler = None
+
+    def start(self, handler):
+        self._handler = handler
+
+    def stop(self):
+        self._handler = None
+
+    def trigger(self, timestamp=None):
+        if self._handler is None:
+            raise RuntimeError("FakeInterrupt has not been started")
+        return self._handler(monotonic() if timestamp is None else timestamp)
@@ -0,0 +1,135 @@
+import threading
+from collections import deque
+
+from . import Touch
+
+
+class TouchManager(object):
+    def __init__(self, queue_size=256, dispatch=True):
+        """Run several touch controllers, one per display, through a single event queue.
+
+        Each controller's interrupt decodes and tags its events with a device id,
+        then appends them to one shared, bounded queue. A single dispatch thread
+        (or poll() / events() when dispatch=False) delivers them to one set of
+        handlers, so N displays don't mean N threads of handler contention.
+
+        :param queue_size: maximum number of queued events across all devices, the oldest are dropped when full
+        :param dispatch: start a thread that drains the queue into the handlers, otherwise call poll() or events()
+
+        """
+        self._touches = {}
+        self._callback_handler = None
+        self._event_handler = None
+
+        # Several interrupts may append at once, deque appends are atomic so this
+        # needs no lock, but unlike Touch's queue there's no coalescing of queue[-1].
+        self._queue = deque(maxlen=queue_size)
+        self._queue_ready = threading.Event()
+        self._dropped = 0
+        self._stop = threading.Event()
+
+        self._dispatcher = None
+        if dispatch:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop)
+            self._dispatcher.daemon = True
+            self._dispatcher.start()
+
+    def add(self, device, bus=11, **kwargs):
+        """Add a touch controller and return its Touch.
+
+        :param device: id to tag this controller's events with, must be unique
+        :param bus: i2c bus number, each controller opens its own handle, or an existing SMBus instance,
+            which shouldn't be shared with a controller at another address
+        :param kwargs: any other Touch arguments, eg: i2c_addr, interrupt_pin, rotation
+
+        Events are queued by the manager, so queue_size and dispatch are not allowed.
+
+        """
+        if device in self._touches:
+            raise ValueError("Device already added: {}".format(device))
+
+        if kwargs.get('queue_size') or kwargs.get('dispatch'):
+            raise ValueError("Events are queued by the TouchManager, queue_size and dispatch are not supported")
+
+        # smbus2 sets the slave address with a separate ioctl before each byte and block
+        # transfer, so controllers on the same bus running from their own interrupt and
+        # recovery threads can't share a handle without talking to each other's address.
+        # Given a bus number, Touch opens a handle of its own, and can reopen it to recover.
+        touch = Touch(bus=bus, **kwargs)
+        touch.on_touch_event(self._make_enqueue(device))
+        self._touches[device] = touch
+        return touch
+
+    def _make_enqueue(self, device):
+        queue = self._queue
+        notify = self._queue_ready.set
+
+        def enqueue(event):
+            event.device = device
+            if len(queue) == queue.maxlen:
+                self._dropped += 1
+            queue.append(event)
+            notify()
+
+        return enqueue
+
+    def __getitem__(self, device):
+        return self._touches[device]
+
+    @property
+    def devices(self):
+        """Ids of the added devices."""
+        return list(self._touches)
+
+    def on_touch(self, handler):
+        """Set a handler to be called with device, touch_id, x, y and state for each touch event."""
+        self._callback_handler = handler
+
+    def on_touch_event(self, handler):
+        """Set a handler to be called with a TouchEvent, with its device set, for each touch event."""
+        self._event_handler = handler
+
+    @property
+    def dropped(self):
+        """Number of queued events discarded because the queue was full."""
+        return self._dropped
+
+    def close(self):
+        """Close every controller, and any bus it opened by number, and stop the dispatch thread."""
+        self._stop.set()
+        for touch in self._touches.values():
+            touch.close()
+        if self._dispatcher is not None:
+            self._queue_ready.set()
+            self._dispatcher.join()
+            self._dispatcher = None
+
+    def events(self):
+        """Yield queued TouchEvents, from every device, until the queue is empty."""
+        queue = self._queue
+        while True:
+            try:
+                yield queue.popleft()
+            except IndexError:
+                return
+
+    def poll(self):
+        """Pass all queued events to the on_touch and on_touch_event handlers.
+
+        Returns the number of events handled.
+
+        """
+        count = 0
+        for event in self.events():
+            if callable(self._callback_handler):
+                self._callback_handler(event.device, event.touch_id, event.x, event.y, event.state)
+            if callable(self._event_handler):
+                self._event_handler(event)
+            count += 1
+        return count
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            self._queue_ready.wait()
+            self._queue_ready.clear()
+            self.poll()
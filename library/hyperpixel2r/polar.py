@@ -0,0 +1,62 @@
+import math
+from array import array
+
+from . import CENTER
+
+
+# Angles and radii are stored in tenths, packed as angle << 16 | radius
+_SCALE = 10
+_MASK = 0xffff
+
+
+def polar(x, y, center=CENTER):
+    """Convert a point to (angle, radius) around the center.
+
+    The angle is in degrees clockwise from 12 o'clock (0 to 360), the radius in pixels.
+
+    """
+    dx = x - center[0]
+    dy = y - center[1]
+    return math.degrees(math.atan2(dx, -dy)) % 360, math.sqrt(dx * dx + dy * dy)
+
+
+class PolarMap(object):
+    def __init__(self, center=CENTER, size=480):
+        """Precomputed lookup table from touch coordinates to polar coordinates.
+
+        Each row of the table is built the first time a touch lands on it, so
+        there's no start-up cost and after that a lookup is a single indexed
+        read with no trig. Values are stored to a tenth of a degree and a
+        tenth of a pixel, in 4 bytes per pixel (under 1MB for 480x480).
+
+        :param center: center of the round display
+        :param size: width and height of the touch area in pixels
+
+        """
+        self.center = center
+        self.size = size
+        self._rows = [None] * size
+
+    def _build_row(self, y):
+        row = array('I', [0]) * self.size
+        for x in range(self.size):
+            angle, radius = polar(x, y, self.center)
+            row[x] = (int(round(angle * _SCALE)) % (360 * _SCALE)) << 16 | int(round(radius * _SCALE))
+        self._rows[y] = row
+        return row
+
+    def build(self):
+        """Build the whole table up front, rather than as touches arrive."""
+        for y in range(self.size):
+            if self._rows[y] is None:
+                self._build_row(y)
+
+    def lookup(self, x, y):
+        """Return (angle, radius) for a point, see polar()."""
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return polar(x, y, self.center)
+        row = self._rows[y]
+        if row is None:
+            row = self._build_row(y)
+        value = row[x]
+        return float(value >> 16) / _SCALE, float(value & _MASK) / _SCALE
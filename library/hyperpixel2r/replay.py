@@ -0,0 +1,220 @@
+import ctypes
+import struct
+import time
+from collections import deque
+
+from . import REG_GESTURE_ID, REG_TOUCH_COUNT, REG_TOUCH_DATA, REPORT_SIZE, MAX_TOUCHES, FakeInterrupt, monotonic
+
+
+I2C_M_RD = 0x0001
+
+# Touch event flags, the top two bits of each touch record
+EVENT_PRESS_DOWN = 0b00
+EVENT_LIFT_UP = 0b01
+EVENT_CONTACT = 0b10
+EVENT_NONE = 0b11
+
+FILE_MAGIC = b'HP2R'
+FILE_VERSION = 1
+
+_FILE_HEADER = struct.Struct("<4sBB")
+# Monotonic read time in seconds and the raw report from register 0x02 onwards
+_FILE_RECORD = struct.Struct("<d{}s".format(REPORT_SIZE))
+
+
+def make_report(*touches):
+    """Build a raw touch report, as read from register 0x02, for up to two touches.
+
+    Each touch is a tuple of (event, touch_id, x, y) or (event, touch_id, x, y, p1, p2).
+    Unused slots report EVENT_LIFT_UP for a spare touch ID.
+
+    """
+    report = bytearray([len(touches)])
+    spare_ids = [touch_id for touch_id in range(MAX_TOUCHES) if touch_id not in [touch[1] for touch in touches]]
+    for slot in range(MAX_TOUCHES):
+        if slot < len(touches):
+            event, touch_id, x, y = touches[slot][:4]
+            p1, p2 = touches[slot][4:] or (0, 0)
+        else:
+            event, touch_id, x, y, p1, p2 = EVENT_LIFT_UP, spare_ids.pop(0), 0, 0, 0, 0
+        report += bytearray([(event << 6) | (x >> 8), x & 0xff, (touch_id << 4) | (y >> 8), y & 0xff, p1, p2])
+    return bytes(report)
+
+
+class FakeController(object):
+    def __init__(self, reports=None, i2c_addr=0x15, repeat=False):
+        """Register level fake of the touch controller, usable in place of an SMBus instance.
+
+        Scripted reports are loaded into registers 0x02 onwards one at a time,
+        on the first read of the gesture ID (0x01) or touch count (0x02) register
+        since the touch records were last read, so the single and multiple
+        transaction read modes of Touch all see one report per interrupt.
+
+        :param reports: sequence of raw reports, see make_report()
+        :param i2c_addr: i2c address the fake responds on
+        :param repeat: cycle through the reports forever instead of serving each once
+
+        """
+        self.i2c_addr = i2c_addr
+        self.registers = bytearray(256)
+        self.reports = deque(bytes(report) for report in reports or ())
+        self.repeat = repeat
+        self.reads = 0
+        self.writes = 0
+        # Set once a report is loaded, until the touch records it goes with have been read
+        self._loaded = False
+
+    def push(self, report):
+        """Queue a raw report to be served by a later read."""
+        self.reports.append(bytes(report))
+
+    def _check_addr(self, i2c_addr):
+        if i2c_addr != self.i2c_addr:
+            raise IOError(121, "Remote I/O error")
+
+    def _read(self, register, length):
+        # Reads from the gesture ID register run on into the touch report
+        if register in (REG_GESTURE_ID, REG_TOUCH_COUNT) and self.reports and not self._loaded:
+            report = self.reports.popleft()
+            if self.repeat:
+                self.reports.append(report)
+            self.registers[REG_TOUCH_COUNT:REG_TOUCH_COUNT + len(report)] = report
+            self._loaded = True
+        if register + length > REG_TOUCH_DATA:
+            self._loaded = False
+        self.reads += 1
+        return self.registers[register:register + length]
+
+    def _write(self, register, data):
+        self.writes += 1
+        self.registers[register:register + len(data)] = bytearray(data)
+
+    def read_byte_data(self, i2c_addr, register):
+        self._check_addr(i2c_addr)
+        return self._read(register, 1)[0]
+
+    def read_i2c_block_data(self, i2c_addr, register, length):
+        self._check_addr(i2c_addr)
+        return list(self._read(register, length))
+
+    def write_byte_data(self, i2c_addr, register, value):
+        self._check_addr(i2c_addr)
+        self._write(register, [value])
+
+    def write_i2c_block_data(self, i2c_addr, register, data):
+        self._check_addr(i2c_addr)
+        self._write(register, data)
+
+    def i2c_rdwr(self, *msgs):
+        register = 0
+        for msg in msgs:
+            self._check_addr(msg.addr)
+            if msg.flags & I2C_M_RD:
+                data = bytes(self._read(register, msg.len))
+                ctypes.memmove(msg.buf, data, len(data))
+            else:
+                data = bytearray(ctypes.string_at(msg.buf, msg.len))
+                register = data[0]
+                if len(data) > 1:
+                    self._write(register, data[1:])
+
+    def close(self):
+        pass
+
+
+class Recorder(object):
+    def __init__(self, bus, path, i2c_addr=0x15):
+        """Wrap an SMBus instance to record every raw touch report read through it.
+
+        Pass the recorder to Touch as its bus. Reports are written to path with
+        their monotonic read time, and can be loaded with read_reports() and
+        replayed with Replay.
+
+        :param bus: SMBus instance connected to the touch controller
+        :param path: file to record reports to
+        :param i2c_addr: i2c address of the touch controller
+
+        """
+        self._bus = bus
+        self._i2c_addr = i2c_addr
+        self._file = open(path, 'wb')
+        self._file.write(_FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, REPORT_SIZE))
+        self._touch_count = 0
+        self.count = 0
+
+    def __getattr__(self, name):
+        return getattr(self._bus, name)
+
+    def _record(self, report):
+        self._file.write(_FILE_RECORD.pack(monotonic(), bytes(report)))
+        self.count += 1
+
+    def i2c_rdwr(self, *msgs):
+        self._bus.i2c_rdwr(*msgs)
+        if len(msgs) == 2 and msgs[0].addr == self._i2c_addr:
+            register = bytearray(ctypes.string_at(msgs[0].buf, 1))[0]
+            if register == REG_TOUCH_COUNT and msgs[1].len == REPORT_SIZE:
+                self._record(ctypes.string_at(msgs[1].buf, REPORT_SIZE))
+            elif register == REG_GESTURE_ID and msgs[1].len == REPORT_SIZE + 1:
+                # Hardware gesture IDs aren't recorded, only the touch report
+                self._record(ctypes.string_at(msgs[1].buf, REPORT_SIZE + 1)[1:])
+
+    def read_byte_data(self, i2c_addr, register):
+        value = self._bus.read_byte_data(i2c_addr, register)
+        if i2c_addr == self._i2c_addr and register == REG_TOUCH_COUNT:
+            self._touch_count = value
+        return value
+
+    def read_i2c_block_data(self, i2c_addr, register, length):
+        data = self._bus.read_i2c_block_data(i2c_addr, register, length)
+        if i2c_addr == self._i2c_addr and register == REG_TOUCH_DATA and length == REPORT_SIZE - 1:
+            self._record(bytearray([self._touch_count]) + bytearray(data))
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def read_reports(path):
+    """Load a recording made by Recorder as a list of (timestamp, report) tuples."""
+    with open(path, 'rb') as f:
+        magic, version, report_size = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+        if magic != FILE_MAGIC or version != FILE_VERSION or report_size != REPORT_SIZE:
+            raise ValueError("{} is not a touch report recording".format(path))
+        data = f.read()
+    return [_FILE_RECORD.unpack_from(data, offset) for offset in range(0, len(data) - _FILE_RECORD.size + 1, _FILE_RECORD.size)]
+
+
+class Replay(object):
+    def __init__(self, reports, speed=1.0, i2c_addr=0x15):
+        """Replay recorded touch reports into a Touch instance.
+
+        Create Touch with bus=replay.bus and interrupt=replay.interrupt, then call run().
+
+        :param reports: path to a recording, or a list of (timestamp, report) tuples
+        :param speed: playback speed relative to the recording, or 0 to replay as fast as possible
+        :param i2c_addr: i2c address of the touch controller
+
+        """
+        if not isinstance(reports, list):
+            reports = read_reports(reports)
+        self.reports = reports
+        self.speed = speed
+        self.bus = FakeController(i2c_addr=i2c_addr)
+        self.interrupt = FakeInterrupt()
+
+    def run(self):
+        """Replay every report, returns the number replayed."""
+        if not self.reports:
+            return 0
+
+        t_first = self.reports[0][0]
+        t_start = monotonic()
+        for timestamp, report in self.reports:
+            if self.speed:
+                delay = t_start + (timestamp - t_first) / self.speed - monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.bus.push(report)
+            self.interrupt.trigger()
+        return len(self.reports)
@@ -0,0 +1,86 @@
+# 4x4 ordered dither (Bayer) thresholds, 0 to 15
+BAYER_4X4 = (
+    (0, 8, 2, 10),
+    (12, 4, 14, 6),
+    (3, 11, 1, 9),
+    (15, 7, 13, 5),
+)
+
+
+class RGB565Converter(object):
+    def __init__(self, width=480, height=480, dither=False):
+        """Convert 24 or 32 bit pygame Surfaces to RGB565 with NumPy.
+
+        Pixels are read through a zero copy pygame.surfarray view and packed
+        using preallocated working arrays, so converting doesn't allocate.
+
+        :param width: width in pixels of the surfaces to convert
+        :param height: height in pixels of the surfaces to convert
+        :param dither: add 4x4 ordered dithering before dropping to 5/6/5 bits, to reduce banding on gradients
+
+        """
+        import numpy
+
+        self._numpy = numpy
+        self.width = width
+        self.height = height
+        self.dither = dither
+
+        shape = (height, width)
+        self._r = numpy.empty(shape, dtype=numpy.uint16)
+        self._g = numpy.empty(shape, dtype=numpy.uint16)
+        self._b = numpy.empty(shape, dtype=numpy.uint16)
+        self._out = numpy.empty(shape, dtype=numpy.uint16)
+
+        if dither:
+            bayer = numpy.array(BAYER_4X4, dtype=numpy.uint16)
+            tiled = numpy.tile(bayer, (height // 4 + 1, width // 4 + 1))[:height, :width]
+            # Red and blue lose three bits, green loses two
+            self._dither_rb = tiled // 2
+            self._dither_g = tiled // 4
+
+    def convert(self, surface, out=None, rect=None):
+        """Convert a surface, returns a (height, width) uint16 array of RGB565 pixels.
+
+        :param surface: a 24 or 32 bit pygame Surface of width x height
+        :param out: array to write into, eg: a view of a mapped framebuffer, defaults to an internal array
+        :param rect: only convert this (x, y, width, height) part of the surface, out is then the size of the rect
+
+        """
+        import pygame
+
+        if surface.get_size() != (self.width, self.height):
+            raise ValueError("Expected a {}x{} surface, got {}x{}".format(self.width, self.height, *surface.get_size()))
+
+        numpy = self._numpy
+        x, y, w, h = rect or (0, 0, self.width, self.height)
+        if out is None:
+            out = self._out[:h, :w]
+        # Slices of the working arrays are views, so this doesn't allocate either
+        r, g, b = self._r[:h, :w], self._g[:h, :w], self._b[:h, :w]
+
+        # surfarray views are indexed x, y so transpose to rows, this locks
+        # the surface until the view is deleted
+        pixels = pygame.surfarray.pixels3d(surface)[x:x + w, y:y + h].transpose(1, 0, 2)
+        numpy.copyto(r, pixels[..., 0])
+        numpy.copyto(g, pixels[..., 1])
+        numpy.copyto(b, pixels[..., 2])
+        del pixels
+
+        if self.dither:
+            # The pattern stays fixed to the screen, whichever part is converted
+            r += self._dither_rb[y:y + h, x:x + w]
+            g += self._dither_g[y:y + h, x:x + w]
+            b += self._dither_rb[y:y + h, x:x + w]
+            numpy.minimum(r, 255, out=r)
+            numpy.minimum(g, 255, out=g)
+            numpy.minimum(b, 255, out=b)
+
+        r >>= 3
+        r <<= 11
+        g >>= 2
+        g <<= 5
+        b >>= 3
+        numpy.bitwise_or(r, g, out=out)
+        numpy.bitwise_or(out, b, out=out)
+        return out
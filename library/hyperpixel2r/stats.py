@@ -0,0 +1,100 @@
+class Histogram(object):
+    def __init__(self, resolution=1e-6, buckets=24):
+        """Fixed size histogram of durations with power of two buckets.
+
+        Bucket 0 counts values below resolution, bucket n counts values
+        from resolution * 2^(n - 1) up to resolution * 2^n. The last bucket
+        also collects anything larger.
+
+        :param resolution: width of the first bucket, in seconds
+        :param buckets: number of buckets
+
+        """
+        self._resolution = resolution
+        self._counts = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        bucket = int(value / self._resolution).bit_length() if value > 0 else 0
+        self._counts[min(bucket, len(self._counts) - 1)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percentile):
+        """Return the upper bound of the bucket containing the given percentile (0 to 100)."""
+        if self.count == 0:
+            return None
+        target = self.count * percentile / 100.0
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= target and count:
+                return min(self._resolution * (1 << bucket), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'buckets': list(self._counts)
+        }
+
+
+class TouchStats(object):
+    """Counters and timing histograms for a Touch instance.
+
+    * interrupts - interrupts (or polls) handled
+    * i2c_reads - i2c transactions attempted to read touch reports, including failed ones
+    * i2c_errors - failed touch report reads
+    * i2c_retries - immediate retries of failed reads
+    * recoveries - times the controller was recovered after repeated read failures
+    * events - touch events emitted by the decoder
+    * duplicates - decoded touches suppressed because they hadn't changed
+    * dispatched - events passed to handlers
+    * dropped - queued events discarded because the queue was full
+    * callback_time - time spent in handlers per event
+    * latency - time from the interrupt to calling handlers per event
+
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.interrupts = 0
+        self.i2c_reads = 0
+        self.i2c_errors = 0
+        self.i2c_retries = 0
+        self.recoveries = 0
+        self.events = 0
+        self.duplicates = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.callback_time = Histogram()
+        self.latency = Histogram()
+
+    def snapshot(self):
+        return {
+            'interrupts': self.interrupts,
+            'i2c_reads': self.i2c_reads,
+            'i2c_errors': self.i2c_errors,
+            'i2c_retries': self.i2c_retries,
+            'recoveries': self.recoveries,
+            'events': self.events,
+            'duplicates': self.duplicates,
+            'dispatched': self.dispatched,
+            'dropped': self.dropped,
+            'callback_time': self.callback_time.snapshot(),
+            'latency': self.latency.snapshot()
+        }
@@ -0,0 +1,105 @@
+# Transform coefficients are fixed point with 16 fractional bits
+_SHIFT = 16
+_ONE = 1 << _SHIFT
+_HALF = 1 << (_SHIFT - 1)
+
+ROTATIONS = (0, 90, 180, 270)
+
+
+def _multiply(m, n):
+    """Multiply two 2x3 affine matrices, m applied after n."""
+    return (
+        (m[0][0] * n[0][0] + m[0][1] * n[1][0], m[0][0] * n[0][1] + m[0][1] * n[1][1], m[0][0] * n[0][2] + m[0][1] * n[1][2] + m[0][2]),
+        (m[1][0] * n[0][0] + m[1][1] * n[1][0], m[1][0] * n[0][1] + m[1][1] * n[1][1], m[1][0] * n[0][2] + m[1][1] * n[1][2] + m[1][2])
+    )
+
+
+def calibrate(points):
+    """Find the affine calibration matrix that best maps raw touches onto their targets.
+
+    :param points: at least three ((touch_x, touch_y), (target_x, target_y)) pairs, not all in a line
+    :return: 2x3 matrix ((a, b, c), (d, e, f)) where x' = ax + by + c and y' = dx + ey + f
+
+    """
+    if len(points) < 3:
+        raise ValueError("Calibration needs at least three points")
+
+    # Least squares via the normal equations, the same 3x3 system solves for both rows
+    ata = [[0.0] * 3 for _ in range(3)]
+    atb = [[0.0, 0.0] for _ in range(3)]
+    for (x, y), (tx, ty) in points:
+        row = (x, y, 1.0)
+        for i in range(3):
+            for j in range(3):
+                ata[i][j] += row[i] * row[j]
+            atb[i][0] += row[i] * tx
+            atb[i][1] += row[i] * ty
+
+    # Gaussian elimination with partial pivoting
+    for column in range(3):
+        pivot = max(range(column, 3), key=lambda r: abs(ata[r][column]))
+        if abs(ata[pivot][column]) < 1e-9:
+            raise ValueError("Calibration points must not all be in a line")
+        ata[column], ata[pivot] = ata[pivot], ata[column]
+        atb[column], atb[pivot] = atb[pivot], atb[column]
+        for r in range(3):
+            if r != column:
+                factor = ata[r][column] / ata[column][column]
+                for c in range(3):
+                    ata[r][c] -= factor * ata[column][c]
+                atb[r][0] -= factor * atb[column][0]
+                atb[r][1] -= factor * atb[column][1]
+
+    solution = [(atb[i][0] / ata[i][i], atb[i][1] / ata[i][i]) for i in range(3)]
+    return (
+        tuple(solution[i][0] for i in range(3)),
+        tuple(solution[i][1] for i in range(3))
+    )
+
+
+class Transform(object):
+    def __init__(self, rotation=0, flip_x=False, flip_y=False, calibration=None, size=480):
+        """Map raw touch coordinates to screen coordinates.
+
+        The calibration matrix is applied first, then the rotation and flips. Everything
+        is composed into one affine transform with integer fixed point coefficients,
+        so applying it costs a few integer multiplies and no float math.
+
+        :param rotation: display rotation in degrees clockwise (0, 90, 180 or 270), touches are rotated to match
+        :param flip_x: mirror touches horizontally, after rotation
+        :param flip_y: mirror touches vertically, after rotation
+        :param calibration: 2x3 (or 3x3) affine matrix from raw touches to panel coordinates, see calibrate()
+        :param size: width and height of the touch area in pixels
+
+        """
+        if rotation not in ROTATIONS:
+            raise ValueError("Invalid rotation: {}, must be one of {}".format(rotation, ROTATIONS))
+
+        edge = size - 1
+        matrix = ((1, 0, 0), (0, 1, 0))
+        if calibration is not None:
+            matrix = tuple(tuple(float(value) for value in row) for row in calibration[:2])
+
+        matrix = _multiply({
+            0: ((1, 0, 0), (0, 1, 0)),
+            90: ((0, 1, 0), (-1, 0, edge)),
+            180: ((-1, 0, edge), (0, -1, edge)),
+            270: ((0, -1, edge), (1, 0, 0)),
+        }[rotation], matrix)
+
+        if flip_x:
+            matrix = _multiply(((-1, 0, edge), (0, 1, 0)), matrix)
+        if flip_y:
+            matrix = _multiply(((1, 0, 0), (0, -1, edge)), matrix)
+
+        self.matrix = matrix
+        # The rounding offset is folded into the constant term
+        self.coefficients = tuple(int(round(value * _ONE)) + (_HALF if i == 2 else 0) for row in matrix for i, value in enumerate(row))
+
+    @property
+    def identity(self):
+        return self.matrix == ((1, 0, 0), (0, 1, 0))
+
+    def apply(self, x, y):
+        a, b, c, d, e, f = self.coefficients
+        return (a * x + b * y + c) >> _SHIFT, (d * x + e * y + f) >> _SHIFT
@@ -1,8 +1,17 @@
+import ctypes
 import sys
 import mock
 import pytest
 
 
+@pytest.fixture(scope='function', autouse=True)
+def cleanup():
+    """Remove the library from sys.modules so each test imports it against fresh mocks."""
+    yield None
+    for module in [name for name in sys.modules if name.split('.')[0] == 'hyperpixel2r']:
+        del sys.modules[module]
+
+
 @pytest.fixture(scope='function', autouse=False)
 def smbus2():
     """Mock smbus module."""
@@ -12,6 +21,12 @@ def smbus2():
     del sys.modules['smbus2']
 
 
+@pytest.fixture(scope='function', autouse=False)
+def smbus2_real():
+    """Use the real smbus2 module, its i2c_msg is needed to exercise i2c_rdwr."""
+    return pytest.importorskip('smbus2')
+
+
 @pytest.fixture(scope='function', autouse=False)
 def GPIO():
     """Mock RPi.GPIO module."""
@@ -24,3 +39,42 @@ def GPIO():
     yield GPIO
     del sys.modules['RPi']
     del sys.modules['RPi.GPIO']
+
+
+@pytest.fixture(scope='function', autouse=False)
+def report(smbus2):
+    """hyperpixel2r.replay.make_report, to build raw touch reports from (event, touch_id, x, y) tuples."""
+    from hyperpixel2r.replay import make_report
+    return make_report
+
+
+@pytest.fixture(scope='function', autouse=False)
+def fake_bus(smbus2):
+    """FakeController serving the raw report set as .report to every read.
+
+    smbus2 is mocked, so its i2c_msgs have no address or flags for FakeController.i2c_rdwr,
+    instead i2c_rdwr is a MagicMock that reads the touch report into the whole of the last message's buffer.
+
+    """
+    from hyperpixel2r import REG_TOUCH_COUNT
+    from hyperpixel2r.replay import FakeController
+
+    class FakeBus(FakeController):
+        def __init__(self):
+            FakeController.__init__(self, repeat=True)
+            self.i2c_rdwr = mock.MagicMock(side_effect=self._i2c_rdwr)
+
+        @property
+        def report(self):
+            return self.reports[0] if self.reports else bytes(self.registers[REG_TOUCH_COUNT:])
+
+        @report.setter
+        def report(self, report):
+            self.reports.clear()
+            self.reports.append(bytes(report))
+
+        def _i2c_rdwr(self, *msgs):
+            data = bytes(self._read(REG_TOUCH_COUNT, ctypes.sizeof(msgs[-1].buf)))
+            ctypes.memmove(msgs[-1].buf, data, len(data))
+
+    return FakeBus()
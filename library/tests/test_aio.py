@@ -0,0 +1,40 @@
+import sys
+import threading
+
+import pytest
+
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 5), reason="requires asyncio async/await")
+
+
+def test_async_touch_wakes_from_interrupt_thread(smbus2, GPIO, fake_bus, report):
+    import asyncio
+    from hyperpixel2r.aio import AsyncTouch
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    touches = AsyncTouch(bus=fake_bus)
+    touch = touches.touch
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        # Nothing queued yet, so the first event must arrive via the pipe
+        loop.call_later(0.01, threading.Thread(target=touch._handle_interrupt, args=(None, )).start)
+        first = loop.run_until_complete(asyncio.wait_for(touches.__anext__(), 1.0))
+        second = loop.run_until_complete(asyncio.wait_for(touches.__anext__(), 1.0))
+    finally:
+        touches.close()
+        asyncio.set_event_loop(None)
+        loop.close()
+
+    assert first[:4] == (0, 100, 200, True)
+    assert second[:4] == (1, 0, 0, False)
+
+
+def test_async_touch_requires_queue(smbus2, GPIO):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.aio import AsyncTouch
+
+    with pytest.raises(ValueError):
+        AsyncTouch(touch=Touch())
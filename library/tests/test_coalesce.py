@@ -0,0 +1,48 @@
+import mock
+
+
+def test_coalesce_moves(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.replay import EVENT_CONTACT, EVENT_LIFT_UP
+
+    touch = Touch(bus=fake_bus, coalesce=10.0)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    for x in range(5):
+        fake_bus.report = report((EVENT_CONTACT, 1, x, 0))
+        touch._handle_interrupt()
+
+    fake_bus.report = report((EVENT_LIFT_UP, 1, 4, 0))
+    touch._handle_interrupt()
+
+    # The press and release are delivered, the moves in between are merged and superseded by the release
+    handler.assert_has_calls((
+        mock.call(1, 0, 0, True),
+        mock.call(0, 0, 0, False),
+        mock.call(1, 4, 0, False),
+    ))
+    assert handler.call_count == 3
+
+
+def test_coalesce_flushes_expired_move(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    touch = Touch(bus=fake_bus, coalesce=10.0)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    with mock.patch('hyperpixel2r.monotonic', return_value=100.0):
+        fake_bus.report = report((EVENT_CONTACT, 1, 0, 0))
+        touch._handle_interrupt()
+        fake_bus.report = report((EVENT_CONTACT, 1, 5, 0))
+        touch._handle_interrupt()
+
+    assert handler.call_count == 2
+
+    with mock.patch('hyperpixel2r.monotonic', return_value=111.0):
+        touch._handle_interrupt()
+
+    handler.assert_called_with(1, 5, 0, True)
+    assert handler.call_count == 3
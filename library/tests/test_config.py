@@ -0,0 +1,40 @@
+import mock
+import pytest
+
+
+def test_configure(smbus2, GPIO):
+    from hyperpixel2r import Touch, FakeInterrupt, IRQ_EN_CHANGE, IRQ_EN_MOTION, REG_IRQ_CTL, REG_NOR_SCAN_PER
+    from hyperpixel2r.replay import FakeController
+
+    controller = FakeController()
+    touch = Touch(bus=controller, interrupt=FakeInterrupt(), fast_read=False)
+    touch.configure(report_period=3, irq_ctl=IRQ_EN_CHANGE | IRQ_EN_MOTION, long_press_time=2)
+
+    assert controller.registers[REG_NOR_SCAN_PER] == 3
+    assert controller.registers[REG_IRQ_CTL] == 0x30
+    config = touch.config()
+    assert config['report_period'] == 3
+    assert config['irq_ctl'] == 0x30
+    assert config['long_press_time'] == 2
+    assert config['disable_auto_sleep'] == 0
+
+    # Settings are written again when the controller is reinitialised
+    controller.registers[REG_NOR_SCAN_PER] = 1
+    touch._init_controller()
+    assert controller.registers[REG_NOR_SCAN_PER] == 3
+
+    with pytest.raises(ValueError):
+        touch.configure(report_rate=3)
+
+
+def test_configure_verify(smbus2, GPIO):
+    from hyperpixel2r import Touch, FakeInterrupt
+
+    bus = mock.MagicMock()
+    bus.read_byte_data.return_value = 0
+    touch = Touch(bus=bus, interrupt=FakeInterrupt())
+
+    with pytest.raises(RuntimeError):
+        touch.configure(report_period=3)
+
+    touch.configure(verify=False, report_period=3)
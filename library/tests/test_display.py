@@ -0,0 +1,152 @@
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='function')
+def pygame(monkeypatch, tmpdir):
+    """Real pygame with no video driver chosen, and the driver cache in a temporary directory."""
+    monkeypatch.delenv('SDL_VIDEODRIVER', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir))
+    pygame = pytest.importorskip('pygame')
+    yield pygame
+    pygame.quit()
+
+
+def test_dirty_rects_merge(smbus2):
+    from hyperpixel2r.display import DirtyRects
+
+    dirty = DirtyRects()
+    dirty.add((10, 10, 10, 10))
+    dirty.add((100, 100, 10, 10))
+    assert len(dirty) == 2
+
+    # Overlapping and touching rects merge into their bounding rect
+    dirty.add((15, 15, 90, 90))
+    assert list(dirty) == [(10, 10, 100, 100)]
+
+    # Rects are clipped to the screen, and empty ones ignored
+    dirty.add((470, -5, 20, 10))
+    dirty.add((500, 500, 10, 10))
+    assert dirty.pop() == [(10, 10, 100, 100), (470, 0, 10, 5)]
+    assert len(dirty) == 0
+
+
+def test_dirty_rects_limit(smbus2):
+    from hyperpixel2r.display import DirtyRects
+
+    dirty = DirtyRects(max_rects=3)
+    for i in range(4):
+        dirty.add((i * 20, i * 20, 5, 5))
+    assert dirty.pop() == [(0, 0, 65, 65)]
+
+    dirty.add_all()
+    assert dirty.pop() == [(0, 0, 480, 480)]
+
+
+def test_circle_mask(smbus2):
+    from hyperpixel2r.display import CircleMask
+
+    mask = CircleMask()
+    # The circle is 7px below the middle, so its top rows are outside it
+    assert mask.spans[0] == (0, 0)
+    assert mask.spans[7] != (0, 0)
+    assert mask.spans[247] == (0, 480)
+    for x1, x2 in mask.spans:
+        assert x1 == 0 or 480 - x2 == x1
+    assert 0.77 < mask.visible / (480.0 * 480.0) < 0.79
+
+    # Bands cover every visible pixel
+    for y, (x1, x2) in enumerate(mask.spans):
+        if x2 > x1:
+            assert any(bx <= x1 and x2 <= bx + bw and by <= y < by + bh for bx, by, bw, bh in mask.bands)
+
+    # Corners clip away entirely
+    assert mask.clip([(0, 0, 40, 40)]) == []
+    assert mask.clip([(230, 280, 20, 20)]) == [(230, 280, 20, 8), (230, 288, 20, 12)]
+
+
+def test_dirty_rects_mask(smbus2):
+    from hyperpixel2r.display import DirtyRects, CircleMask
+
+    dirty = DirtyRects(mask=CircleMask())
+    dirty.add((0, 0, 40, 40))
+    assert dirty.pop() == []
+
+
+def test_display_probe_and_cache(smbus2, pygame, tmpdir):
+    from hyperpixel2r import Display
+
+    cache = str(tmpdir.join('cache', 'display.json'))
+    with Display(drivers=('nope', 'dummy'), cache=cache) as display:
+        assert display.driver == 'dummy'
+        assert not display.rawfb
+        assert not display.cached
+        assert [(driver, error is None) for driver, _, error in display.probes] == [('nope', False), ('dummy', True)]
+        size = display.screen.get_size()
+        display.update()
+        assert display.first_frame >= display.startup
+
+    assert json.load(open(cache)) == {'driver': 'dummy', 'size': list(size)}
+
+    # The next start goes straight to the cached driver and size
+    pygame.display.quit()
+    with Display(drivers=('nope', 'dummy'), cache=cache) as display:
+        assert display.cached
+        assert [driver for driver, _, _ in display.probes] == ['dummy']
+        assert display.screen.get_size() == size
+        assert 'Using SDL driver dummy (cached)' in display.report()
+
+
+def test_display_stale_cache(smbus2, pygame, tmpdir):
+    from hyperpixel2r import Display
+
+    cache = tmpdir.join('display.json')
+    cache.write('{"driver": "nope", "size": [640, 480]}')
+    with Display(drivers=('nope', 'dummy'), cache=str(cache)) as display:
+        assert display.driver == 'dummy'
+        assert not display.cached
+        # The stale driver isn't tried twice
+        assert [driver for driver, _, _ in display.probes] == ['nope', 'dummy']
+
+    assert json.load(cache.open())['driver'] == 'dummy'
+
+
+def test_display_environment(smbus2, pygame, monkeypatch, tmpdir):
+    from hyperpixel2r import Display
+
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    with Display(drivers=('nope',)) as display:
+        assert display.driver == 'dummy'
+
+    # An explicitly chosen driver isn't cached
+    assert not tmpdir.join('hyperpixel2r', 'display.json').check()
+
+
+def test_display_framebuffer(smbus2, pygame, tmpdir):
+    from hyperpixel2r import Display
+    from hyperpixel2r.display import CircleMask
+    from hyperpixel2r.framebuffer import Framebuffer
+
+    path = tmpdir.join('fb0')
+    path.write_binary(b'\x00' * (480 * 480 * 2))
+    cache = str(tmpdir.join('display.json'))
+
+    mask = CircleMask()
+    with Display(drivers=('nope',), cache=cache, framebuffer=Framebuffer(str(path), width=480, height=480), mask=mask) as display:
+        assert display.rawfb
+        assert display.driver is None
+        assert display.screen.get_size() == (480, 480)
+        dirty = display.dirty_rects()
+        assert dirty.mask is mask
+        display.screen.fill((255, 255, 255))
+        dirty.add((0, 240, 480, 10))
+        display.update(dirty.pop())
+
+    assert path.read_binary().count(b'\xff\xff') == sum(x2 - x1 for x1, x2 in mask.spans[240:250])
+    assert json.load(open(cache))['driver'] is None
+
+    # A cached framebuffer skips probing SDL entirely
+    with Display(drivers=('nope',), cache=cache, framebuffer=Framebuffer(str(path), width=480, height=480)) as display:
+        assert display.cached
+        assert [driver for driver, _, _ in display.probes] == ['framebuffer']
@@ -0,0 +1,87 @@
+import mock
+import pytest
+
+
+def test_dead_zone(smbus2):
+    from hyperpixel2r.filters import DeadZone
+
+    dead_zone = DeadZone(radius=3)
+    assert dead_zone.apply(0, 100, 100, 0.0, True) == (100, 100)
+    assert dead_zone.apply(0, 102, 98, 0.01, False) == (100, 100)
+    assert dead_zone.apply(0, 104, 100, 0.02, False) == (104, 100)
+    assert dead_zone.apply(0, 102, 100, 0.03, False) == (104, 100)
+
+    # Slots are independent
+    assert dead_zone.apply(1, 10, 10, 0.03, True) == (10, 10)
+    assert dead_zone.apply(0, 105, 100, 0.04, False) == (104, 100)
+
+
+def test_ema(smbus2):
+    from hyperpixel2r.filters import EMA
+
+    ema = EMA(alpha=0.5)
+    assert ema.apply(0, 100, 100, 0.0, True) == (100, 100)
+    assert ema.apply(0, 110, 90, 0.01, False) == (105, 95)
+    assert ema.apply(0, 110, 90, 0.02, False) == (108, 92)
+
+    with pytest.raises(ValueError):
+        EMA(alpha=0)
+
+
+def test_one_euro(smbus2):
+    from hyperpixel2r.filters import OneEuro
+
+    one_euro = OneEuro()
+    assert one_euro.apply(0, 100, 100, 0.0, True) == (100, 100)
+
+    # Jitter around a resting finger is mostly removed
+    positions = [one_euro.apply(0, 100 + (i % 2) * 4, 100, i * 0.01, False)[0] for i in range(1, 20)]
+    assert max(positions) - min(positions) <= 2
+
+    # A fast drag follows closely
+    for i in range(20, 40):
+        x, _ = one_euro.apply(0, 100 + (i - 19) * 20, 100, i * 0.01, False)
+    assert x > 100 + 20 * 20 - 40
+
+
+def test_touch_filter(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.filters import DeadZone
+
+    touch = Touch(bus=fake_bus, filter=DeadZone(radius=3))
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    for x, state in ((100, 0b10), (102, 0b10), (101, 0b10), (110, 0b10), (111, 0b01)):
+        fake_bus.report = report((state, 0, x, 100))
+        touch._handle_interrupt()
+
+    # The resting jitter never gets reported, the lift stays where the filtered touch was
+    assert handler.call_args_list == [
+        mock.call(0, 100, 100, True),
+        mock.call(1, 0, 0, False),
+        mock.call(0, 110, 100, True),
+        mock.call(0, 110, 100, False),
+    ]
+
+
+def test_touch_filter_release(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.filters import EMA
+
+    touch = Touch(bus=fake_bus, filter=EMA(alpha=0.5))
+    events = []
+    touch.on_touch_event(events.append)
+
+    for x, state in ((100, 0b10), (200, 0b10), (240, 0b01)):
+        fake_bus.report = report((state, 0, x, 100))
+        touch._handle_interrupt()
+
+    touches = [(event.x, event.state) for event in events if event.touch_id == 0]
+    assert touches == [(100, True), (150, True), (150, False)]
+
+
+def test_filter_passes_through(smbus2):
+    from hyperpixel2r.filters import Filter
+
+    assert Filter().apply(0, 10, 20, 0.0, True) == (10, 20)
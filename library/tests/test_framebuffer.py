@@ -0,0 +1,187 @@
+import mock
+import pytest
+
+
+@pytest.fixture(scope='function')
+def pygame(monkeypatch):
+    """Real pygame with the dummy video driver, for Surfaces."""
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    pygame = pytest.importorskip('pygame')
+    yield pygame
+    pygame.quit()
+
+
+@pytest.fixture(scope='function')
+def fbdev(tmpdir):
+    """A regular file standing in for a 640x480 16bpp framebuffer device."""
+    path = tmpdir.join('fb0')
+    path.write_binary(b'\x00' * (640 * 480 * 2))
+    return str(path)
+
+
+@pytest.mark.parametrize('use_numpy', (True, False))
+def test_framebuffer_blit(smbus2, pygame, fbdev, use_numpy):
+    from hyperpixel2r.framebuffer import Framebuffer
+
+    if use_numpy:
+        pytest.importorskip('numpy')
+
+    surface = pygame.Surface((480, 480))
+    surface.fill((255, 0, 0))
+    surface.fill((0, 0, 255), (0, 479, 480, 1))
+
+    converter = None
+    if use_numpy:
+        from hyperpixel2r.rgb565 import RGB565Converter
+        converter = RGB565Converter()
+
+    with Framebuffer(fbdev, width=640, height=480, converter=converter) as fb:
+        assert (fb.bpp, fb.stride, fb.size) == (16, 1280, 640 * 480 * 2)
+        fb.blit(surface)
+        fb.blit(surface)
+
+    data = open(fbdev, 'rb').read()
+    # Rows are stride bytes apart, anything beyond the surface is untouched
+    assert data[0:960] == b'\x00\xf8' * 480
+    assert data[960:1280] == b'\x00' * 320
+    assert data[479 * 1280:479 * 1280 + 960] == b'\x1f\x00' * 480
+
+
+def test_framebuffer_contiguous(smbus2, pygame, tmpdir):
+    from hyperpixel2r.framebuffer import Framebuffer
+
+    path = tmpdir.join('fb0')
+    path.write_binary(b'\x00' * (480 * 480 * 2))
+    surface = pygame.Surface((480, 480))
+    surface.fill((0, 255, 0))
+
+    fb = Framebuffer(str(path), width=480, height=480)
+    fb.blit(surface)
+    assert fb.buffer[0:4] == b'\xe0\x07\xe0\x07'
+    fb.close()
+
+
+@pytest.mark.parametrize('use_numpy', (True, False))
+def test_framebuffer_dirty_rects(smbus2, pygame, fbdev, use_numpy):
+    from hyperpixel2r.framebuffer import Framebuffer
+
+    converter = None
+    if use_numpy:
+        pytest.importorskip('numpy')
+        from hyperpixel2r.rgb565 import RGB565Converter
+        converter = RGB565Converter(dither=True)
+
+    surface = pygame.Surface((480, 480))
+    surface.fill((255, 255, 255))
+
+    with Framebuffer(fbdev, width=640, height=480, converter=converter) as fb:
+        fb.blit(surface, [(10, 20, 4, 2), pygame.Rect(470, 470, 20, 20)])
+
+    data = open(fbdev, 'rb').read()
+    white = b'\xff\xff'
+    # Only the rects, clipped to the surface, are written
+    assert data[20 * 1280 + 20:20 * 1280 + 28] == white * 4
+    assert data[21 * 1280 + 20:21 * 1280 + 28] == white * 4
+    assert data[20 * 1280 + 18:20 * 1280 + 20] == b'\x00\x00'
+    assert data[22 * 1280 + 20:22 * 1280 + 28] == b'\x00' * 8
+    assert data[479 * 1280 + 940:479 * 1280 + 962] == white * 10 + b'\x00\x00'
+    assert data.count(white) == 8 + 100
+
+
+@pytest.mark.parametrize('use_numpy', (True, False))
+def test_framebuffer_mask(smbus2, pygame, tmpdir, use_numpy):
+    from hyperpixel2r.display import CircleMask
+    from hyperpixel2r.framebuffer import Framebuffer
+
+    converter = None
+    if use_numpy:
+        pytest.importorskip('numpy')
+        from hyperpixel2r.rgb565 import RGB565Converter
+        converter = RGB565Converter()
+
+    path = tmpdir.join('fb0')
+    path.write_binary(b'\x00' * (480 * 480 * 2))
+    surface = pygame.Surface((480, 480))
+    surface.fill((255, 255, 255))
+
+    mask = CircleMask()
+    with Framebuffer(str(path), width=480, height=480, converter=converter, mask=mask) as fb:
+        fb.blit(surface)
+        pixels = fb.buffer[:]
+
+    def pixel(x, y):
+        return pixels[(y * 480 + x) * 2:(y * 480 + x) * 2 + 2]
+
+    assert pixel(240, 247) == b'\xff\xff'
+    assert pixel(0, 247) == b'\xff\xff'
+    written = pixels.count(b'\xff\xff')
+    if use_numpy:
+        # NumPy converts the whole frame, the mask's bands cost more than they save
+        assert written == 480 * 480
+    else:
+        # Whole rows of each band are copied, with black outside the band
+        assert pixel(0, 0) == b'\x00\x00'
+        assert pixel(479, 479) == b'\x00\x00'
+        assert mask.visible <= written <= sum(w * h for _, _, w, h in mask.bands)
+
+
+def test_framebuffer_mask_spans(smbus2, pygame, tmpdir):
+    from hyperpixel2r.display import CircleMask
+    from hyperpixel2r.framebuffer import Framebuffer
+
+    path = tmpdir.join('fb0')
+    path.write_binary(b'\x00' * (480 * 480 * 2))
+    surface = pygame.Surface((480, 480))
+    surface.fill((255, 255, 255))
+
+    # The left half doesn't cover whole visible rows, so only the visible part of each is written
+    mask = CircleMask()
+    with Framebuffer(str(path), width=480, height=480, mask=mask) as fb:
+        fb.blit(surface, [(0, 0, 200, 480)])
+        pixels = fb.buffer[:]
+
+    expected = sum(max(0, min(x2, 200) - x1) for x1, x2 in mask.spans)
+    assert pixels.count(b'\xff\xff') == expected
+    assert pixels[(247 * 480 + 200) * 2:(247 * 480 + 201) * 2] == b'\x00\x00'
+
+
+@pytest.mark.parametrize('use_numpy', (True, False))
+def test_framebuffer_panned(smbus2, pygame, tmpdir, use_numpy):
+    from hyperpixel2r import framebuffer
+    from hyperpixel2r.framebuffer import Framebuffer, FBIOGET_VSCREENINFO, _VSCREENINFO, _FSCREENINFO, _SCREENINFO_SIZE
+
+    converter = None
+    if use_numpy:
+        pytest.importorskip('numpy')
+        from hyperpixel2r.rgb565 import RGB565Converter
+        converter = RGB565Converter()
+
+    # Double buffered 480x480 RGB565, showing the second page
+    var = _VSCREENINFO.pack(480, 480, 480, 960, 0, 480, 16, 0, 11, 5, 0, 5, 6, 0, 0, 5, 0, 0, 0, 0)
+    fix = _FSCREENINFO.pack(b'hyperpixel2r', 0, 960 * 960, 0, 0, 2, 0, 1, 0, 960)
+
+    def ioctl(fd, request):
+        info = var if request == FBIOGET_VSCREENINFO else fix
+        return bytearray(info) + bytearray(_SCREENINFO_SIZE - len(info))
+
+    path = tmpdir.join('fb0')
+    path.write_binary(b'\x00' * (960 * 960))
+    surface = pygame.Surface((480, 480))
+    surface.fill((255, 255, 255))
+
+    with mock.patch.object(framebuffer, '_ioctl', ioctl):
+        with Framebuffer(str(path), converter=converter) as fb:
+            assert (fb.width, fb.height, fb.stride, fb.offset) == (480, 480, 960, 480 * 960)
+            fb.blit(surface)
+
+    data = path.read_binary()
+    assert data[:480 * 960] == b'\x00' * (480 * 960)
+    assert data[480 * 960:] == b'\xff' * (480 * 960)
+
+
+def test_framebuffer_needs_geometry(smbus2, fbdev):
+    from hyperpixel2r.framebuffer import Framebuffer
+
+    # A regular file has no screen info, so the size has to be given
+    with pytest.raises((IOError, OSError)):
+        Framebuffer(fbdev)
@@ -0,0 +1,79 @@
+import pytest
+
+
+@pytest.fixture(scope='function')
+def gestures(smbus2):
+    from hyperpixel2r.gestures import GestureRecognizer
+
+    recognizer = GestureRecognizer(dial=False)
+    recognizer.gestures = []
+    recognizer.on_gesture(recognizer.gestures.append)
+    return recognizer
+
+
+def feed(recognizer, *events):
+    from hyperpixel2r import TouchEvent
+
+    for touch_id, x, y, state, timestamp in events:
+        recognizer.feed(TouchEvent(touch_id, x, y, state, timestamp))
+    return [gesture.gesture for gesture in recognizer.gestures]
+
+
+def test_tap_and_double_tap(gestures):
+    assert feed(gestures,
+                (0, 100, 100, True, 0.0), (0, 102, 101, False, 0.1),
+                (0, 104, 100, True, 0.2), (0, 104, 100, False, 0.3),
+                (0, 300, 300, True, 1.0), (0, 300, 300, False, 1.1)) == ['tap', 'double_tap', 'tap']
+
+
+def test_long_press(gestures):
+    # Held still, so only update() can notice the long press
+    feed(gestures, (0, 100, 100, True, 0.0))
+    gestures.update(0.5)
+    assert gestures.gestures == []
+    gestures.update(0.7)
+    assert feed(gestures, (0, 100, 100, False, 1.0)) == ['long_press']
+
+    # Released after the long press time without update() being called
+    gestures.gestures[:] = []
+    assert feed(gestures, (0, 100, 100, True, 2.0), (0, 100, 100, False, 3.0)) == ['long_press']
+
+
+def test_swipe(gestures):
+    assert feed(gestures, (0, 100, 240, True, 0.0), (0, 200, 250, True, 0.05), (0, 300, 250, False, 0.1)) == ['swipe']
+    swipe = gestures.gestures[0]
+    assert swipe.direction == 'right'
+    assert swipe.velocity > 1000
+
+    # Too slow to be a swipe
+    gestures.gestures[:] = []
+    assert feed(gestures, (0, 240, 300, True, 0.0), (0, 240, 200, True, 1.0), (0, 240, 100, False, 2.0)) == []
+
+
+def test_pinch_and_rotate(gestures):
+    assert feed(gestures,
+                (0, 200, 240, True, 0.0), (1, 280, 240, True, 0.0),
+                (1, 320, 240, True, 0.1),
+                (0, 240, 200, True, 0.2), (1, 240, 280, True, 0.2),
+                (0, 240, 200, False, 0.3), (1, 240, 280, False, 0.3)) == ['pinch', 'pinch', 'rotate', 'pinch', 'rotate']
+    assert gestures.gestures[0].scale == pytest.approx(1.5)
+    assert gestures.gestures[-1].angle == pytest.approx(90, abs=1)
+
+
+def test_dial(smbus2):
+    from hyperpixel2r import TouchEvent
+    from hyperpixel2r.gestures import GestureRecognizer, dial_angle
+
+    assert dial_angle(240, 47) == 0
+    assert dial_angle(440, 247) == 90
+    assert dial_angle(240, 447) == 180
+    assert dial_angle(40, 247) == 270
+
+    recognizer = GestureRecognizer(dial_inner_radius=150)
+    gestures = []
+    recognizer.on_gesture(gestures.append)
+    recognizer.feed(TouchEvent(0, 240, 247, True, 0.0))
+    recognizer.feed(TouchEvent(0, 240, 47, True, 0.1))
+    recognizer.feed(TouchEvent(0, 440, 247, True, 0.2))
+
+    assert [(gesture.gesture, gesture.angle, gesture.delta) for gesture in gestures] == [('dial', 0, 0), ('dial', 90, 90)]
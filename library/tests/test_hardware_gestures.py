@@ -0,0 +1,96 @@
+import mock
+
+
+def make_touch(controller, fast_read=False, **kwargs):
+    from hyperpixel2r import Touch, FakeInterrupt
+
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=controller, interrupt=interrupt, fast_read=fast_read, **kwargs)
+    return touch, interrupt
+
+
+def test_hardware_gestures(smbus2, GPIO):
+    from hyperpixel2r import REG_GESTURE_ID, HW_GESTURE_SWIPE_UP, HW_GESTURE_CLICK
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+    controller = FakeController([make_report((EVENT_CONTACT, 0, 100, 200))], repeat=True)
+    touch, interrupt = make_touch(controller, hardware_gestures=True)
+    gestures = []
+    touch.on_gesture(gestures.append)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    controller.registers[REG_GESTURE_ID] = HW_GESTURE_SWIPE_UP
+    interrupt.trigger()
+    interrupt.trigger()
+    controller.registers[REG_GESTURE_ID] = HW_GESTURE_CLICK
+    interrupt.trigger()
+
+    # Touches are still decoded, gestures are only emitted when they change
+    handler.assert_any_call(0, 100, 200, True)
+    assert [(g.gesture, g.direction, g.x, g.y, g.touch_id) for g in gestures] == [
+        ('swipe', 'up', 100, 200, 0),
+        ('tap', None, 100, 200, 0),
+    ]
+    assert controller.writes == 0
+
+
+def test_hardware_gestures_fast_read(smbus2_real):
+    from hyperpixel2r import REG_GESTURE_ID, HW_GESTURE_SWIPE_LEFT
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+    controller = FakeController([make_report((EVENT_CONTACT, 0, 100, 200))], repeat=True)
+    touch, interrupt = make_touch(controller, fast_read=True, hardware_gestures=True)
+    gestures = []
+    touch.on_gesture(gestures.append)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    # The gesture ID is the first byte of the single transfer, followed by the touch report
+    controller.registers[REG_GESTURE_ID] = HW_GESTURE_SWIPE_LEFT
+    interrupt.trigger()
+
+    handler.assert_any_call(0, 100, 200, True)
+    assert [(g.gesture, g.direction, g.x, g.y) for g in gestures] == [('swipe', 'left', 100, 200)]
+    assert controller.reads == 1
+
+
+def test_hardware_gestures_rotated(smbus2, GPIO):
+    from hyperpixel2r import REG_GESTURE_ID, HW_GESTURE_SWIPE_UP
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+    controller = FakeController([make_report((EVENT_CONTACT, 0, 10, 20))])
+    touch, interrupt = make_touch(controller, hardware_gestures=True, rotation=90)
+    gestures = []
+    touch.on_gesture(gestures.append)
+
+    controller.registers[REG_GESTURE_ID] = HW_GESTURE_SWIPE_UP
+    interrupt.trigger()
+
+    # The panel's top edge is on the left of a display rotated 90 degrees clockwise
+    assert (gestures[0].direction, gestures[0].x, gestures[0].y) == ('left', 20, 469)
+
+
+def test_gesture_only(smbus2, GPIO):
+    from hyperpixel2r import REG_GESTURE_ID, REG_IRQ_CTL, REG_MOTION_MASK, MOTION_D_CLICK, HW_GESTURE_DOUBLE_CLICK
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+    controller = FakeController([make_report((EVENT_CONTACT, 0, 100, 200))], repeat=True)
+    touch, interrupt = make_touch(controller, gesture_only=True, stats=True)
+    # EnMotion, gestures pulse the interrupt line
+    assert controller.registers[REG_IRQ_CTL] == 0x10
+    assert controller.registers[REG_MOTION_MASK] == MOTION_D_CLICK
+
+    gestures = []
+    touch.on_gesture(gestures.append)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    controller.registers[REG_GESTURE_ID] = HW_GESTURE_DOUBLE_CLICK
+    interrupt.trigger()
+    interrupt.trigger()
+
+    # Every interrupt is a gesture, and touches aren't decoded at all
+    assert [g.gesture for g in gestures] == ['double_tap', 'double_tap']
+    handler.assert_not_called()
+    assert touch.stats()['i2c_reads'] == 6
@@ -0,0 +1,82 @@
+import sys
+import time
+
+import mock
+import pytest
+
+
+@pytest.fixture(scope='function', autouse=False)
+def gpiod():
+    """Mock gpiod module."""
+    gpiod = mock.MagicMock()
+    sys.modules['gpiod'] = gpiod
+    sys.modules['gpiod.line'] = gpiod.line
+    yield gpiod
+    del sys.modules['gpiod']
+    del sys.modules['gpiod.line']
+
+
+def test_fake_interrupt_without_gpio(smbus2, fake_bus, report):
+    from hyperpixel2r import Touch, FakeInterrupt
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    interrupt = FakeInterrupt()
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    touch = Touch(bus=fake_bus, interrupt=interrupt)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    assert interrupt.trigger() is True
+    handler.assert_any_call(0, 100, 200, True)
+
+    touch.close()
+    with pytest.raises(RuntimeError):
+        interrupt.trigger()
+
+    assert 'RPi.GPIO' not in sys.modules
+
+
+def test_gpio_interrupt_board_mode(smbus2, GPIO):
+    from hyperpixel2r import Touch
+
+    GPIO.getmode.return_value = GPIO.BOARD
+    touch = Touch()
+
+    GPIO.setmode.assert_not_called()
+    GPIO.setup.assert_called_once_with(13, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+    touch.close()
+    GPIO.remove_event_detect.assert_called_once_with(13)
+
+
+def test_gpio_interrupt_bcm_mode_already_set(smbus2, GPIO):
+    from hyperpixel2r import Touch
+
+    GPIO.getmode.return_value = GPIO.BCM
+    Touch()
+
+    GPIO.setmode.assert_not_called()
+    GPIO.setup.assert_called_once_with(27, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+
+def test_gpiod_interrupt(smbus2, gpiod, fake_bus, report):
+    from hyperpixel2r import Touch, GPIODInterrupt
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    request = gpiod.request_lines.return_value
+    request.wait_edge_events.side_effect = [True] + [False] * 1000
+    request.read_edge_events.return_value = [mock.Mock(timestamp_ns=1500000000), mock.Mock(timestamp_ns=1600000000)]
+
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    with mock.patch('hyperpixel2r.Touch._handle_interrupt') as handle_interrupt:
+        touch = Touch(bus=fake_bus, interrupt=GPIODInterrupt(chip='/dev/gpiochip4'))
+
+        t_start = time.time()
+        while not handle_interrupt.called and time.time() - t_start < 1.0:
+            time.sleep(0.001)
+
+        touch.close()
+
+    assert gpiod.request_lines.call_args[0] == ('/dev/gpiochip4', )
+    handle_interrupt.assert_called_once_with(1.5)
+    request.release.assert_called_once_with()
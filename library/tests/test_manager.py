@@ -0,0 +1,110 @@
+import threading
+
+import mock
+import pytest
+
+
+def test_manager_buses(smbus2, GPIO):
+    from hyperpixel2r import FakeInterrupt
+    from hyperpixel2r.manager import TouchManager
+
+    smbus2.SMBus.side_effect = lambda bus: mock.MagicMock(name='SMBus({})'.format(bus))
+    manager = TouchManager(dispatch=False)
+    manager.add('left', bus=11, interrupt=FakeInterrupt())
+    manager.add('middle', bus=11, i2c_addr=0x16, interrupt=FakeInterrupt())
+    manager.add('right', bus=12, interrupt=FakeInterrupt())
+
+    # Every controller has its own handle, even on the same bus
+    assert smbus2.SMBus.call_args_list == [mock.call(11), mock.call(11), mock.call(12)]
+    assert manager['left']._bus is not manager['middle']._bus
+    assert sorted(manager.devices) == ['left', 'middle', 'right']
+
+    with pytest.raises(ValueError):
+        manager.add('left', bus=13)
+
+    with pytest.raises(ValueError):
+        manager.add('queued', bus=13, queue_size=64)
+
+    manager.close()
+    for device in ('left', 'middle', 'right'):
+        manager[device]._bus.close.assert_called_once_with()
+
+
+def test_manager_same_bus_addresses(smbus2, GPIO):
+    from hyperpixel2r import FakeInterrupt
+    from hyperpixel2r.manager import TouchManager
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+    # The fakes only answer on their own address, as a handle left pointing at the other would fail
+    controllers = {
+        0x15: FakeController([make_report((EVENT_CONTACT, 0, 10, 20))], i2c_addr=0x15),
+        0x16: FakeController([make_report((EVENT_CONTACT, 0, 30, 40))], i2c_addr=0x16),
+    }
+    opened = [controllers[0x15], controllers[0x16]]
+    smbus2.SMBus.side_effect = lambda bus: opened.pop(0)
+
+    manager = TouchManager(dispatch=False)
+    left, right = FakeInterrupt(), FakeInterrupt()
+    manager.add('left', bus=11, i2c_addr=0x15, interrupt=left, fast_read=False)
+    manager.add('right', bus=11, i2c_addr=0x16, interrupt=right, fast_read=False)
+    manager['left'].configure(report_period=2)
+    manager['right'].configure(report_period=3)
+
+    handler = mock.MagicMock()
+    manager.on_touch(handler)
+    right.trigger()
+    left.trigger()
+    manager.poll()
+
+    handler.assert_any_call('left', 0, 10, 20, True)
+    handler.assert_any_call('right', 0, 30, 40, True)
+    assert manager['left'].config()['report_period'] == 2
+    assert manager['right'].config()['report_period'] == 3
+    manager.close()
+
+
+def test_manager_events(smbus2, GPIO):
+    from hyperpixel2r import FakeInterrupt
+    from hyperpixel2r.manager import TouchManager
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+    manager = TouchManager(queue_size=3, dispatch=False)
+    left, right = FakeInterrupt(), FakeInterrupt()
+    manager.add('left', bus=FakeController([make_report((EVENT_CONTACT, 0, 10, 20))]), interrupt=left, fast_read=False)
+    manager.add('right', bus=FakeController([make_report((EVENT_CONTACT, 0, 30, 40))]), interrupt=right, fast_read=False)
+
+    handler = mock.MagicMock()
+    manager.on_touch(handler)
+    left.trigger()
+    right.trigger()
+
+    # Each report has a touch and a released slot, the queue only holds three
+    assert manager.dropped == 1
+    assert manager.poll() == 3
+    assert handler.call_args_list[-2:] == [mock.call('right', 0, 30, 40, True), mock.call('right', 1, 0, 0, False)]
+    manager.close()
+
+
+def test_manager_dispatch(smbus2, GPIO):
+    from hyperpixel2r import FakeInterrupt
+    from hyperpixel2r.manager import TouchManager
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT
+
+    manager = TouchManager()
+    interrupt = FakeInterrupt()
+    manager.add(0, bus=FakeController([make_report((EVENT_CONTACT, 0, 10, 20))]), interrupt=interrupt, fast_read=False)
+
+    events = []
+    handled = threading.Event()
+
+    @manager.on_touch_event
+    def handler(event):
+        events.append(event)
+        if len(events) == 2:
+            handled.set()
+
+    interrupt.trigger()
+    assert handled.wait(1.0)
+
+    manager.close()
+    assert [(event.device, event.touch_id, event.state) for event in events] == [(0, 0, True), (0, 1, False)]
@@ -0,0 +1,45 @@
+import mock
+import pytest
+
+
+def test_polar(smbus2):
+    from hyperpixel2r.polar import polar
+
+    assert polar(240, 47) == (0, 200)
+    assert polar(440, 247) == (90, 200)
+    assert polar(240, 447) == (180, 200)
+    assert polar(40, 247) == (270, 200)
+
+
+def test_polar_map_lookup(smbus2):
+    from hyperpixel2r.polar import PolarMap, polar
+
+    polar_map = PolarMap()
+    assert polar_map._rows[100] is None
+
+    for x, y in ((0, 0), (100, 100), (479, 479), (240, 247), (123, 456)):
+        angle, radius = polar_map.lookup(x, y)
+        expected_angle, expected_radius = polar(x, y)
+        assert angle == pytest.approx(expected_angle, abs=0.05)
+        assert radius == pytest.approx(expected_radius, abs=0.05)
+
+    # Only the rows that have been touched are built
+    assert polar_map._rows[100] is not None
+    assert polar_map._rows[101] is None
+
+    # Outside the table falls back to calculating directly
+    assert polar_map.lookup(240, 600) == polar(240, 600)
+
+
+def test_touch_polar_events(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+
+    fake_bus.report = report((0b10, 0, 440, 247))
+    touch = Touch(bus=fake_bus, polar=True)
+    handler = mock.MagicMock()
+    touch.on_touch_event(handler)
+    touch._handle_interrupt()
+
+    event = handler.call_args_list[0][0][0]
+    assert (event.angle, event.radius) == (90, 200)
+    assert len(event) == 8
@@ -0,0 +1,44 @@
+import time
+
+import mock
+
+
+def wait_for(condition, timeout=1.0):
+    t_start = time.time()
+    while not condition() and time.time() - t_start < timeout:
+        time.sleep(0.001)
+
+
+def test_polling_without_interrupt(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    touch = Touch(bus=fake_bus, polling=True, polling_interval=0.001, polling_idle_interval=0.001)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    wait_for(lambda: handler.call_count >= 1)
+    touch.close()
+
+    GPIO.add_event_detect.assert_not_called()
+    handler.assert_any_call(0, 100, 200, True)
+
+
+def test_polling_adaptive_rate(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    # Nothing is touched after the first read, so the poller backs off to the idle interval
+    touch = Touch(bus=fake_bus, polling=True, polling_interval=0.001, polling_idle_interval=60)
+    time.sleep(0.05)
+    touch.close()
+    assert fake_bus.i2c_rdwr.call_count == 1
+
+    # A finger is down, so the poller keeps reading at the fast interval
+    fake_bus.i2c_rdwr.reset_mock()
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    touch = Touch(bus=fake_bus, polling=True, polling_interval=0.001, polling_idle_interval=60)
+    wait_for(lambda: fake_bus.i2c_rdwr.call_count > 10)
+    touch.close()
+    assert fake_bus.i2c_rdwr.call_count > 10
@@ -0,0 +1,82 @@
+import time
+
+import mock
+import pytest
+
+
+def test_queued_events_not_dispatched_in_interrupt(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    bus = fake_bus
+    touch = Touch(bus=bus, queue_size=8)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    touch._handle_interrupt()
+
+    handler.assert_not_called()
+    assert touch.poll() == 2
+    handler.assert_has_calls((
+        mock.call(0, 100, 200, True),
+        mock.call(1, 0, 0, False),
+    ))
+    assert touch.poll() == 0
+
+
+def test_queue_drop_oldest(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    bus = fake_bus
+    touch = Touch(bus=bus, queue_size=2)
+
+    for x in range(3):
+        bus.report = report((EVENT_CONTACT, 1, x, 0), (EVENT_CONTACT, 0, x, 0))
+        touch._handle_interrupt()
+
+    assert touch.dropped == 4
+    assert [event[:4] for event in touch.events()] == [(1, 2, 0, True), (0, 2, 0, True)]
+
+
+def test_queue_coalesce(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch, QUEUE_COALESCE
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    bus = fake_bus
+    touch = Touch(bus=bus, queue_size=8, queue_policy=QUEUE_COALESCE)
+
+    for x in range(5):
+        bus.report = report((EVENT_CONTACT, 1, x, 0))
+        touch._handle_interrupt()
+
+    assert touch.dropped == 0
+    assert [event[:4] for event in touch.events()] == [(1, 0, 0, True), (0, 0, 0, False), (1, 4, 0, True)]
+
+
+def test_dispatch_thread(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    bus = fake_bus
+    touch = Touch(bus=bus, queue_size=8, dispatch=True)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    touch._handle_interrupt()
+
+    t_start = time.time()
+    while handler.call_count < 2 and time.time() - t_start < 1.0:
+        time.sleep(0.001)
+
+    touch.close()
+    assert handler.call_count == 2
+
+
+def test_dispatch_requires_queue(smbus2, GPIO):
+    from hyperpixel2r import Touch
+
+    with pytest.raises(ValueError):
+        Touch(dispatch=True)
@@ -0,0 +1,118 @@
+import threading
+
+import mock
+import pytest
+
+
+I2C_ERROR = IOError(121, "Remote I/O error")
+
+
+def failing(bus, count):
+    """Make the fake bus fail this many reads before it starts serving reports."""
+    failures = iter([I2C_ERROR] * count)
+
+    def i2c_rdwr(*msgs):
+        for error in failures:
+            raise error
+        bus._i2c_rdwr(*msgs)
+
+    return i2c_rdwr
+
+
+def test_read_retry(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch, FakeInterrupt
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=fake_bus, interrupt=interrupt, stats=True)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    fake_bus.i2c_rdwr.side_effect = failing(fake_bus, 1)
+    assert interrupt.trigger() is True
+    handler.assert_any_call(0, 100, 200, True)
+
+    assert touch.errors == 1
+    assert touch.recoveries == 0
+    stats = touch.stats()
+    assert stats['i2c_errors'] == 1
+    assert stats['i2c_retries'] == 1
+    assert touch._recovery is None
+
+
+def test_recovery(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch, FakeInterrupt, REG_DIS_AUTO_SLEEP, REG_NOR_SCAN_PER
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    fake_bus.write_byte_data = mock.MagicMock()
+    fake_bus.close = mock.MagicMock()
+    smbus2.SMBus.return_value = fake_bus
+
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=11, interrupt=interrupt, stats=True, retries=1, backoff=0.001, auto_sleep=False, report_period=1)
+    init = [mock.call(0x15, REG_NOR_SCAN_PER, 1), mock.call(0x15, REG_DIS_AUTO_SLEEP, 0x01)]
+    assert fake_bus.write_byte_data.call_args_list == init
+
+    recovered = threading.Event()
+    events = []
+
+    @touch.on_touch
+    def handler(*args):
+        events.append(args)
+        recovered.set()
+
+    # The retry and the first two recovery attempts fail
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    fake_bus.i2c_rdwr.side_effect = failing(fake_bus, 4)
+    assert interrupt.trigger() is False
+
+    # Interrupts are ignored while the recovery thread owns the bus
+    assert interrupt.trigger() is False
+
+    assert recovered.wait(1.0)
+    touch._recovery.join(1.0)
+    assert not touch._recovering
+    assert events[0] == (0, 100, 200, True)
+    assert touch.errors == 4
+    assert touch.recoveries == 1
+    assert touch.stats()['recoveries'] == 1
+
+    # The bus was reopened and the controller reinitialised on each attempt
+    assert smbus2.SMBus.call_args_list == [mock.call(11)] * 4
+    assert fake_bus.write_byte_data.call_args_list == init * 4
+
+    touch.close()
+
+
+def test_recovery_at_start_up(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch, FakeInterrupt, REG_NOR_SCAN_PER
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    # A controller that's still booting NAKs the first register writes
+    fake_bus.write_byte_data = mock.MagicMock(side_effect=[I2C_ERROR, I2C_ERROR, None])
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    recovered = threading.Event()
+    events = []
+
+    interrupt = FakeInterrupt()
+    # Long enough a backoff for the handler to be set before the first attempt
+    touch = Touch(bus=fake_bus, interrupt=interrupt, backoff=0.05, report_period=1)
+    touch.on_touch(lambda *args: (events.append(args), recovered.set()))
+
+    assert recovered.wait(1.0)
+    touch._recovery.join(1.0)
+    assert not touch._recovering
+    assert events[0] == (0, 100, 200, True)
+    assert touch.errors == 2
+    assert touch.recoveries == 1
+    assert fake_bus.write_byte_data.call_args_list[-1] == mock.call(0x15, REG_NOR_SCAN_PER, 1)
+    touch.close()
+
+
+def test_start_up_error_without_recovery(smbus2, GPIO, fake_bus):
+    from hyperpixel2r import Touch, FakeInterrupt
+
+    fake_bus.write_byte_data = mock.MagicMock(side_effect=I2C_ERROR)
+    with pytest.raises(IOError):
+        Touch(bus=fake_bus, interrupt=FakeInterrupt(), recover=False, report_period=1)
@@ -0,0 +1,73 @@
+import mock
+import pytest
+
+
+@pytest.mark.parametrize('hardware_gestures', (False, True))
+@pytest.mark.parametrize('fast_read', (True, False))
+def test_fake_controller(smbus2_real, fast_read, hardware_gestures):
+    from hyperpixel2r import Touch, FakeInterrupt
+    from hyperpixel2r.replay import FakeController, make_report, EVENT_CONTACT, EVENT_LIFT_UP
+
+    controller = FakeController([
+        make_report((EVENT_CONTACT, 0, 100, 200, 30, 4)),
+        make_report((EVENT_CONTACT, 0, 110, 210, 30, 4)),
+        make_report((EVENT_LIFT_UP, 0, 110, 210)),
+    ])
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=controller, interrupt=interrupt, fast_read=fast_read, hardware_gestures=hardware_gestures)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+
+    for _ in range(3):
+        interrupt.trigger()
+
+    handler.assert_has_calls((
+        mock.call(0, 100, 200, True),
+        mock.call(1, 0, 0, False),
+        mock.call(0, 110, 210, True),
+        mock.call(0, 110, 210, False),
+    ))
+    # Each interrupt sees the next report, however many transactions it reads it with
+    assert handler.call_count == 4
+    assert not controller.reports
+    assert controller.reads == 3 * touch._reads_per_report
+
+
+@pytest.mark.parametrize('hardware_gestures', (False, True))
+def test_record_and_replay(smbus2_real, tmpdir, hardware_gestures):
+    from hyperpixel2r import Touch, FakeInterrupt
+    from hyperpixel2r.replay import FakeController, Recorder, Replay, read_reports, make_report, EVENT_CONTACT, EVENT_LIFT_UP
+
+    reports = [make_report((EVENT_CONTACT, 1, x, 240)) for x in range(0, 480, 48)]
+    reports.append(make_report((EVENT_LIFT_UP, 1, 432, 240)))
+
+    path = str(tmpdir.join('touches.hp2r'))
+    recorder = Recorder(FakeController(reports), path)
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=recorder, interrupt=interrupt, hardware_gestures=hardware_gestures)
+    recorded = mock.MagicMock()
+    touch.on_touch(recorded)
+    for _ in reports:
+        interrupt.trigger()
+    recorder.close()
+
+    assert recorder.count == len(reports)
+    assert [report for timestamp, report in read_reports(path)] == reports
+
+    replay = Replay(path, speed=0)
+    touch = Touch(bus=replay.bus, interrupt=replay.interrupt)
+    replayed = mock.MagicMock()
+    touch.on_touch(replayed)
+
+    assert replay.run() == len(reports)
+    assert replayed.call_args_list == recorded.call_args_list
+
+
+def test_read_reports_rejects_other_files(smbus2_real, tmpdir):
+    from hyperpixel2r.replay import read_reports
+
+    path = tmpdir.join('not-a-recording')
+    path.write_binary(b'\x00' * 64)
+
+    with pytest.raises(ValueError):
+        read_reports(str(path))
@@ -0,0 +1,52 @@
+import pytest
+
+
+@pytest.fixture(scope='function')
+def pygame(monkeypatch):
+    """Real pygame with the dummy video driver, for Surfaces."""
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    pygame = pytest.importorskip('pygame')
+    pygame.display.init()
+    yield pygame
+    pygame.quit()
+
+
+@pytest.fixture(scope='function')
+def numpy():
+    return pytest.importorskip('numpy')
+
+
+def test_matches_pygame(smbus2, pygame, numpy):
+    from hyperpixel2r.rgb565 import RGB565Converter
+
+    surface = pygame.Surface((64, 48))
+    pygame.surfarray.blit_array(surface, numpy.random.randint(0, 256, (64, 48, 3), dtype=numpy.uint8))
+    expected = numpy.frombuffer(surface.convert(16, 0).get_buffer().raw, dtype=numpy.uint16).reshape(48, 64)
+
+    converter = RGB565Converter(64, 48)
+    assert (converter.convert(surface) == expected).all()
+
+    # Converting into a caller's array, eg: the framebuffer
+    out = numpy.zeros((48, 64), dtype=numpy.uint16)
+    assert converter.convert(surface, out) is out
+    assert (out == expected).all()
+
+
+def test_dither(smbus2, pygame, numpy):
+    from hyperpixel2r.rgb565 import RGB565Converter
+
+    # Halfway between two 5 bit red levels and two 6 bit green levels
+    surface = pygame.Surface((16, 16))
+    surface.fill((12, 6, 255))
+
+    plain = RGB565Converter(16, 16).convert(surface).copy()
+    assert len(numpy.unique(plain)) == 1
+
+    dithered = RGB565Converter(16, 16, dither=True).convert(surface)
+    red = dithered >> 11
+    green = (dithered >> 5) & 0x3f
+    assert sorted(numpy.unique(red)) == [1, 2]
+    assert red.mean() == pytest.approx(12 / 8.0, abs=0.1)
+    assert green.mean() == pytest.approx(6 / 4.0, abs=0.1)
+    # Blue is already at the top and mustn't wrap
+    assert ((dithered & 0x1f) == 31).all()
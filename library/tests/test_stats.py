@@ -0,0 +1,74 @@
+import mock
+import pytest
+
+
+def test_stats_counters(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch, FakeInterrupt
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=fake_bus, interrupt=interrupt, stats=True, recover=False)
+    hook = mock.MagicMock()
+    touch.on_stats(hook)
+
+    fake_bus.report = report((EVENT_CONTACT, 0, 100, 200))
+    interrupt.trigger()
+    interrupt.trigger()
+
+    fake_bus.i2c_rdwr.side_effect = IOError(121, "Remote I/O error")
+    with pytest.raises(IOError):
+        interrupt.trigger()
+
+    stats = touch.stats(reset=True)
+    assert stats['interrupts'] == 3
+    # The failed read was attempted too
+    assert stats['i2c_reads'] == 3
+    assert stats['i2c_errors'] == 1
+    assert stats['events'] == 2
+    assert stats['duplicates'] == 2
+    assert stats['dispatched'] == 2
+    assert stats['latency']['count'] == 2
+    assert stats['callback_time']['count'] == 2
+    assert hook.call_count == 2
+
+    assert touch.stats()['interrupts'] == 0
+
+
+def test_stats_dropped_reset(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch, FakeInterrupt
+    from hyperpixel2r.replay import EVENT_CONTACT
+
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=fake_bus, interrupt=interrupt, stats=True, queue_size=2)
+
+    for x in range(3):
+        fake_bus.report = report((EVENT_CONTACT, 1, x, 0), (EVENT_CONTACT, 0, x, 0))
+        interrupt.trigger()
+
+    assert touch.stats(reset=True)['dropped'] == 4
+    assert touch.stats()['dropped'] == 0
+    # The property keeps the lifetime total
+    assert touch.dropped == 4
+
+
+def test_stats_disabled(smbus2, GPIO):
+    from hyperpixel2r import Touch
+
+    with pytest.raises(RuntimeError):
+        Touch().stats()
+
+
+def test_histogram_percentiles():
+    from hyperpixel2r.stats import Histogram
+
+    histogram = Histogram(resolution=1e-6)
+    for _ in range(99):
+        histogram.add(3e-6)
+    histogram.add(1e-3)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 100
+    assert snapshot['p50'] == 4e-6
+    assert snapshot['p99'] == 4e-6
+    assert snapshot['max'] == 1e-3
+    assert histogram.percentile(100) == 1e-3
@@ -0,0 +1,122 @@
+import mock
+
+
+def test_fast_read_single_transaction(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+
+    bus = fake_bus
+    bus.report = report((0b10, 1, 100, 200))
+
+    touch = Touch(bus=bus)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+    touch._handle_interrupt()
+
+    smbus2.SMBus.assert_not_called()
+    smbus2.i2c_msg.write.assert_called_once_with(0x15, [0x02])
+    smbus2.i2c_msg.read.assert_called_once_with(0x15, 13)
+    bus.i2c_rdwr.assert_called_once_with(touch._msg_register, touch._msg_report)
+    handler.assert_has_calls((
+        mock.call(1, 100, 200, True),
+        mock.call(0, 0, 0, False),
+    ))
+
+
+def test_duplicate_report_suppressed(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+
+    bus = fake_bus
+    bus.report = report((0b10, 1, 100, 200))
+
+    touch = Touch(bus=bus)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+    touch._handle_interrupt()
+    touch._handle_interrupt()
+
+    assert handler.call_count == 2
+
+
+def test_legacy_read(smbus2, GPIO):
+    from hyperpixel2r import Touch
+
+    bus = smbus2.SMBus.return_value
+    bus.read_i2c_block_data.return_value = [
+        0x80, 0x64, 0x10, 0xc8, 0x00, 0x00,
+        0x40, 0x00, 0x00, 0x00, 0x00, 0x00,
+    ]
+
+    touch = Touch(fast_read=False)
+    handler = mock.MagicMock()
+    touch.on_touch(handler)
+    touch._handle_interrupt()
+
+    bus.read_byte_data.assert_called_once_with(0x15, 0x02)
+    bus.read_i2c_block_data.assert_called_once_with(0x15, 0x03, 12)
+    handler.assert_has_calls((
+        mock.call(1, 100, 200, True),
+        mock.call(0, 0, 0, False),
+    ))
+
+
+def test_close_bus(smbus2, GPIO):
+    from hyperpixel2r import Touch, FakeInterrupt
+
+    # A bus opened from its number is closed with the Touch, one passed in is left open
+    touch = Touch(bus=11, interrupt=FakeInterrupt())
+    touch.close()
+    smbus2.SMBus.return_value.close.assert_called_once_with()
+
+    bus = mock.MagicMock()
+    Touch(bus=bus, interrupt=FakeInterrupt()).close()
+    bus.close.assert_not_called()
+
+
+def test_touch_event_timestamps(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch, FakeInterrupt
+
+    fake_bus.report = report((0b10, 1, 100, 200))
+    interrupt = FakeInterrupt()
+    touch = Touch(bus=fake_bus, interrupt=interrupt)
+    handler = mock.MagicMock()
+    event_handler = mock.MagicMock()
+    touch.on_touch(handler)
+    touch.on_touch_event(event_handler)
+
+    with mock.patch('hyperpixel2r.monotonic', return_value=12.5):
+        interrupt.trigger(12.0)
+
+    handler.assert_any_call(1, 100, 200, True)
+    event = event_handler.call_args_list[0][0][0]
+    assert (event.touch_id, event.x, event.y, event.state) == (1, 100, 200, True)
+    assert event.timestamp == 12.0
+    assert event.read_timestamp == 12.5
+
+
+def test_touch_event_tuple_compatible():
+    from hyperpixel2r import TouchEvent
+
+    event = TouchEvent(1, 100, 200, True, 1.0, 2.0, 30, 4)
+
+    touch_id, x, y, state, timestamp, read_timestamp, p1, p2 = event
+    assert (touch_id, x, y, state, p1, p2) == (1, 100, 200, True, 30, 4)
+    assert event[:4] == (1, 100, 200, True)
+    assert event == TouchEvent(1, 100, 200, True, 1.0, 2.0, 30, 4)
+    assert not hasattr(event, '__dict__')
+
+
+def test_touch_event_pressure(smbus2, GPIO, fake_bus):
+    from hyperpixel2r import Touch
+
+    fake_bus.report = bytes(bytearray([
+        0x01,
+        0x80, 0x64, 0x10, 0xc8, 0x2a, 0x05,
+        0x40, 0x00, 0x00, 0x00, 0x00, 0x00,
+    ]))
+    touch = Touch(bus=fake_bus)
+    handler = mock.MagicMock()
+    touch.on_touch_event(handler)
+    touch._handle_interrupt()
+
+    event = handler.call_args_list[0][0][0]
+    assert (event.touch_id, event.p1, event.p2) == (1, 0x2a, 0x05)
@@ -0,0 +1,56 @@
+import mock
+import pytest
+
+
+def test_transform_rotation(smbus2):
+    from hyperpixel2r.transform import Transform
+
+    assert Transform().identity
+    assert Transform(0).apply(10, 20) == (10, 20)
+    # Display rotated 90 degrees clockwise, the panel's top right is the screen's top left
+    assert Transform(90).apply(479, 0) == (0, 0)
+    assert Transform(90).apply(10, 20) == (20, 469)
+    assert Transform(180).apply(10, 20) == (469, 459)
+    assert Transform(270).apply(10, 20) == (459, 10)
+    assert Transform(flip_x=True).apply(10, 20) == (469, 20)
+    assert Transform(flip_y=True).apply(10, 20) == (10, 459)
+    assert Transform(180, flip_x=True, flip_y=True).identity
+
+    with pytest.raises(ValueError):
+        Transform(45)
+
+
+def test_calibrate(smbus2):
+    from hyperpixel2r.transform import Transform, calibrate
+
+    # Touches that read slightly scaled and offset from their targets
+    targets = [(240, 100), (240, 380), (100, 240), (380, 240), (240, 240)]
+    points = [((int(x * 0.95) + 7, int(y * 1.02) - 4), (x, y)) for x, y in targets]
+    matrix = calibrate(points)
+
+    transform = Transform(calibration=matrix)
+    for touch_xy, (x, y) in points:
+        tx, ty = transform.apply(*touch_xy)
+        assert abs(tx - x) <= 1
+        assert abs(ty - y) <= 1
+
+    with pytest.raises(ValueError):
+        calibrate(points[:2])
+
+    with pytest.raises(ValueError):
+        calibrate([((0, 0), (0, 0)), ((1, 1), (1, 1)), ((2, 2), (2, 2))])
+
+
+def test_touch_rotation(smbus2, GPIO, fake_bus, report):
+    from hyperpixel2r import Touch
+    from hyperpixel2r.polar import polar
+
+    fake_bus.report = report((0b10, 0, 10, 20))
+    touch = Touch(bus=fake_bus, rotation=90, polar=True)
+    handler = mock.MagicMock()
+    touch.on_touch_event(handler)
+    touch._handle_interrupt()
+
+    event = handler.call_args_list[0][0][0]
+    assert (event.x, event.y) == (20, 469)
+    assert event.angle == pytest.approx(polar(20, 469)[0], abs=0.05)